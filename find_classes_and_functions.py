@@ -1,23 +1,44 @@
+import ast
 import os
-import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+def _collect_definitions(node, current_class, results):
+    """Recorre el árbol guardando (clase, función) para cada def encontrado."""
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, ast.ClassDef):
+            _collect_definitions(child, child.name, results)
+        elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            results.append((current_class, child.name))
+            _collect_definitions(child, current_class, results)
+        else:
+            _collect_definitions(child, current_class, results)
+
+def _scan_file(path):
+    """Analiza un archivo y devuelve sus pares (clase, función)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (SyntaxError, UnicodeDecodeError) as e:
+        print(f"No se pudo analizar {path}: {e}", file=sys.stderr)
+        return []
+
+    results = []
+    _collect_definitions(tree, None, results)
+    return results
 
 def find_classes_and_functions(root_dir):
-    pattern_class = re.compile(r'class (\w+)')
-    pattern_func = re.compile(r'def (\w+)')
+    paths = [
+        os.path.join(subdir, file)
+        for subdir, _, files in os.walk(root_dir)
+        for file in files
+        if file.endswith('.py')
+    ]
 
-    for subdir, _, files in os.walk(root_dir):
-        for file in files:
-            if file.endswith('.py'):
-                with open(os.path.join(subdir, file), 'r') as f:
-                    current_class = None
-                    for line in f:
-                        match_class = pattern_class.search(line)
-                        if match_class:
-                            current_class = match_class.group(1)
-                        
-                        match_func = pattern_func.search(line)
-                        if match_func:
-                            func = match_func.group(1)
-                            print(f"{current_class or 'NoClass'}::{func}")
+    with ProcessPoolExecutor() as executor:
+        for definitions in executor.map(_scan_file, paths, chunksize=32):
+            for current_class, func in definitions:
+                print(f"{current_class or 'NoClass'}::{func}")
 
-find_classes_and_functions(".")
+if __name__ == '__main__':
+    find_classes_and_functions(".")
@@ -1,12 +1,17 @@
-from datetime import datetime, timezone
+from datetime import datetime
+from contextlib import contextmanager
 import logging
+import re
 import uuid
-from typing import List, Dict, Set, Optional
+from typing import List, Dict, Set, Optional, Tuple
 from enum import Enum
+from .clock import parse_ddmmyyyy, utcnow_cached
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Metacaracteres que indican que la búsqueda debe hacerse por regex
+_REGEX_METACHARS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
 class ActivityStatus(Enum):
     PENDING = "Pendiente"
     IN_PROGRESS = "En Curso"
@@ -18,6 +23,15 @@ class Activity:
     Clase que representa una actividad/grupo en Enlace Rural.
     Incluye manejo de zonas horarias y validaciones mejoradas.
     """
+    __slots__ = (
+        'id', 'name', 'description', 'start_date', 'end_date', 'location',
+        'coordinator_id', 'max_participants', 'participants', 'admins',
+        'status', 'surveys_ready', 'created_at', 'updated_at', 'change_log',
+        '_pending_log', '_batch_depth', '_formatted_dates'
+    )
+
+    _REQUIRED_PARTICIPANT_FIELDS = frozenset({'name', 'birth_date', 'id'})
+
     def __init__(self, name: str, description: str, start_date: str, 
                  end_date: str, location: str, coordinator_id: str,
                  max_participants: Optional[int] = None):
@@ -60,20 +74,28 @@ class Activity:
         self.surveys_ready = False
         
         # Timestamps en UTC
-        self.created_at = datetime.now(timezone.utc)
-        self.updated_at = datetime.now(timezone.utc)
+        now = utcnow_cached()[0]
+        self.created_at = now
+        self.updated_at = now
         
-        # Registro de cambios
+        # Registro de cambios (timestamps como datetime; se formatean al serializar)
         self.change_log = [{
-            'timestamp': self.created_at.isoformat(),
+            'timestamp': now,
             'action': 'created',
             'by': coordinator_id
         }]
+        
+        # Entradas pendientes mientras hay un lote abierto
+        self._pending_log: Optional[List[Dict]] = None
+        self._batch_depth = 0
+        
+        # Caché de fechas formateadas: (inicio, fin, inicio_str, fin_str)
+        self._formatted_dates = (None, None, '', '')
 
     def _validate_input(self, name: str, description: str, location: str, 
                        coordinator_id: str, max_participants: Optional[int]) -> None:
         """Valida los datos de entrada básicos."""
-        if not all([name, description, location, coordinator_id]):
+        if not (name and description and location and coordinator_id):
             raise ValueError("Todos los campos obligatorios deben estar completos")
             
         if max_participants is not None and max_participants <= 0:
@@ -93,8 +115,7 @@ class Activity:
             ValueError: Si el formato es incorrecto
         """
         try:
-            dt = datetime.strptime(date_str, '%d/%m/%Y')
-            return dt.replace(tzinfo=timezone.utc)
+            return parse_ddmmyyyy(date_str)
         except ValueError:
             raise ValueError(f"Formato de fecha incorrecto: {date_str}. Use DD/MM/YYYY")
 
@@ -109,7 +130,7 @@ class Activity:
         Returns:
             bool: True si se añadió correctamente
         """
-        if not self._is_admin(added_by):
+        if added_by not in self.admins:
             return False
             
         if self.max_participants and len(self.participants) >= self.max_participants:
@@ -133,7 +154,7 @@ class Activity:
         Returns:
             bool: True si se eliminó correctamente
         """
-        if not self._is_admin(removed_by):
+        if removed_by not in self.admins:
             return False
             
         if participant_id not in self.participants:
@@ -151,7 +172,7 @@ class Activity:
             participant_id: ID del participante a promover
             promoted_by: ID del admin que promueve
         """
-        if not self._is_admin(promoted_by) or participant_id not in self.participants:
+        if promoted_by not in self.admins or participant_id not in self.participants:
             return False
             
         if participant_id in self.admins:
@@ -169,7 +190,7 @@ class Activity:
             new_status: Nuevo estado
             updated_by: ID del admin que actualiza
         """
-        if not self._is_admin(updated_by):
+        if updated_by not in self.admins:
             return False
             
         old_status = self.status
@@ -184,9 +205,9 @@ class Activity:
         Args:
             participant_data: Diccionario con datos del participante
         """
-        required_fields = {'name', 'birth_date', 'id'}
-        return all(field in participant_data and participant_data[field] 
-                  for field in required_fields)
+        required_fields = self._REQUIRED_PARTICIPANT_FIELDS
+        return (required_fields.issubset(participant_data)
+                and all(participant_data[field] for field in required_fields))
 
     def mark_surveys_ready(self, marked_by: str) -> bool:
         """
@@ -195,60 +216,149 @@ class Activity:
         Args:
             marked_by: ID del admin que marca
         """
-        if not self._is_admin(marked_by):
+        if marked_by not in self.admins:
             return False
             
         self.surveys_ready = True
         self._update_timestamp(marked_by, "surveys_marked_ready")
         return True
 
-    def _is_admin(self, user_id: str) -> bool:
-        """Verifica si un usuario es administrador."""
-        return user_id in self.admins
-
     def _update_timestamp(self, user_id: str, action: str) -> None:
         """
         Actualiza timestamp y log de cambios.
         
+        Si hay un lote abierto, la entrada se acumula y se escribe en end_batch.
+        
         Args:
             user_id: ID del usuario que realiza la acción
             action: Descripción de la acción realizada
         """
-        now = datetime.now(timezone.utc)
-        self.updated_at = now
-        self.change_log.append({
-            'timestamp': now.isoformat(),
+        now = utcnow_cached()[0]
+        entry = {
+            'timestamp': now,
             'action': action,
             'by': user_id
-        })
+        }
+        if self._pending_log is not None:
+            self._pending_log.append(entry)
+            return
+            
+        self.updated_at = now
+        self.change_log.append(entry)
+
+    def begin_batch(self) -> None:
+        """
+        Abre un lote: los cambios se acumulan hasta llamar a end_batch.
+        
+        Los lotes pueden anidarse; solo el end_batch más externo vuelca las entradas.
+        """
+        if self._batch_depth == 0:
+            self._pending_log = []
+        self._batch_depth += 1
+
+    def end_batch(self) -> int:
+        """
+        Cierra el lote, vuelca las entradas acumuladas al log de cambios
+        y actualiza updated_at una sola vez.
+        
+        Returns:
+            int: Número de cambios volcados (0 si el lote sigue abierto en un nivel superior)
+            
+        Raises:
+            RuntimeError: Si no hay un lote abierto
+        """
+        if self._batch_depth == 0:
+            raise RuntimeError("No hay un lote abierto")
+            
+        self._batch_depth -= 1
+        if self._batch_depth > 0:
+            return 0
+            
+        pending = self._pending_log
+        self._pending_log = None
+        if not pending:
+            return 0
+            
+        self.change_log.extend(pending)
+        self.updated_at = utcnow_cached()[0]
+        return len(pending)
+
+    @contextmanager
+    def batch(self):
+        """Context manager equivalente a begin_batch/end_batch."""
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            self.end_batch()
+
+    def _format_dates(self) -> Tuple[str, str]:
+        """
+        Formatea las fechas de inicio y fin, reutilizando el último resultado.
+        
+        Las dos llamadas a strftime representan más de la mitad del costo de to_dict.
+        """
+        start, end, start_str, end_str = self._formatted_dates
+        if start is not self.start_date or end is not self.end_date:
+            start_str = self.start_date.strftime('%d/%m/%Y')
+            end_str = self.end_date.strftime('%d/%m/%Y')
+            self._formatted_dates = (self.start_date, self.end_date, start_str, end_str)
+        return start_str, end_str
 
-    def to_dict(self) -> Dict:
+    def _serialize_change_log(self) -> List[Dict]:
+        """
+        Devuelve el log de cambios con los timestamps en formato ISO.
+        
+        Las entradas cargadas desde la base de datos ya traen el timestamp
+        como cadena y se copian tal cual.
+        """
+        return [
+            {**entry, 'timestamp': entry['timestamp'].isoformat()}
+            if isinstance(entry['timestamp'], datetime) else entry
+            for entry in self.change_log
+        ]
+
+    def to_dict(self, *, shallow: bool = False) -> Dict:
         """
         Convierte la actividad a un diccionario para almacenamiento.
         
+        Args:
+            shallow: Si es True, devuelve los conjuntos de participantes y
+                administradores sin copiarlos. Solo para uso en memoria: el
+                resultado no es serializable a BSON.
+        
         Returns:
             Dict: Representación del objeto en formato diccionario
         """
+        start_date, end_date = self._format_dates()
+        if shallow:
+            participants, admins = self.participants, self.admins
+        else:
+            participants, admins = list(self.participants), list(self.admins)
         return {
             "id": self.id,
             "name": self.name,
             "description": self.description,
-            "start_date": self.start_date.strftime('%d/%m/%Y'),
-            "end_date": self.end_date.strftime('%d/%m/%Y'),
+            "start_date": start_date,
+            "end_date": end_date,
             "location": self.location,
             "coordinator_id": self.coordinator_id,
             "max_participants": self.max_participants,
-            "participants": list(self.participants),
-            "admins": list(self.admins),
+            "participants": participants,
+            "admins": admins,
             "status": self.status.value,
             "surveys_ready": self.surveys_ready,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
-            "change_log": self.change_log
+            "change_log": self._serialize_change_log()
         }
 
 class ActivityManager:
     """Gestor de actividades/grupos."""
+    # Proyecciones por defecto: los listados omiten los arreglos grandes
+    _LIST_PROJECTION = {"change_log": 0, "participants": 0}
+    _SEARCH_PROJECTION = {"id": 1, "name": 1, "location": 1, "status": 1, "_id": 0}
+
     def __init__(self, db_manager):
         self.db_manager = db_manager
         self.collection_name = "activities"
@@ -267,16 +377,63 @@ class ActivityManager:
                 return activity
             return None
         except Exception as e:
-            logger.error(f"Error al crear actividad: {str(e)}")
+            logger.error("Error al crear actividad: %s", e)
             return None
 
-    def get_activity(self, activity_id: str) -> Optional[Dict]:
-        """Obtiene una actividad por su ID."""
-        return self.db_manager.find_one(self.collection_name, {"id": activity_id})
+    def add_participants(self, activity: Activity, participant_ids: List[str],
+                         added_by: str) -> List[str]:
+        """
+        Añade varios participantes a una actividad con una sola escritura.
+        
+        Args:
+            activity: Actividad a modificar
+            participant_ids: IDs de los participantes a añadir
+            added_by: ID del admin que añade
+            
+        Returns:
+            List[str]: IDs que se añadieron y persistieron. Si la escritura falla,
+                la actividad en memoria se revierte y se devuelve una lista vacía.
+        """
+        log_size = len(activity.change_log)
+        previous_updated_at = activity.updated_at
+        with activity.batch():
+            added = [pid for pid in participant_ids
+                     if activity.add_participant(pid, added_by)]
+        
+        if not added:
+            return []
+            
+        try:
+            updated = self.db_manager.update_one(
+                self.collection_name,
+                {"id": activity.id},
+                {"$set": {
+                    "participants": list(activity.participants),
+                    "change_log": activity._serialize_change_log(),
+                    "updated_at": activity.updated_at
+                }}
+            )
+        except Exception as e:
+            logger.error("Error al añadir participantes: %s", e)
+            updated = False
+            
+        if not updated:
+            # Revertir los cambios en memoria para reflejar lo persistido
+            activity.participants.difference_update(added)
+            del activity.change_log[log_size:]
+            activity.updated_at = previous_updated_at
+            return []
+        return added
+
+    def get_activity(self, activity_id: str,
+                     projection: Optional[Dict] = None) -> Optional[Dict]:
+        """Obtiene una actividad por su ID (opcionalmente solo algunos campos)."""
+        return self.db_manager.find_one(self.collection_name, {"id": activity_id},
+                                        projection=projection)
 
     def update_activity(self, activity_id: str, update_data: Dict) -> bool:
         """Actualiza una actividad."""
-        update_data['updated_at'] = datetime.now(timezone.utc)
+        update_data['updated_at'] = utcnow_cached()[0]
         return self.db_manager.update_one(
             self.collection_name,
             {"id": activity_id},
@@ -285,47 +442,83 @@ class ActivityManager:
 
     def delete_activity(self, activity_id: str, deleted_by: str) -> bool:
         """Elimina una actividad."""
-        activity = self.get_activity(activity_id)
+        activity = self.get_activity(activity_id, projection={"admins": 1})
         if not activity or deleted_by not in activity.get('admins', []):
             return False
         return self.db_manager.delete_one(self.collection_name, {"id": activity_id})
 
-    def list_coordinator_activities(self, coordinator_id: str) -> List[Dict]:
-        """Lista actividades de un coordinador."""
+    def list_coordinator_activities(self, coordinator_id: str,
+                                    projection: Optional[Dict] = _LIST_PROJECTION) -> List[Dict]:
+        """
+        Lista actividades de un coordinador.
+        
+        Por defecto omite change_log y participants; pasar projection=None
+        para obtener los documentos completos.
+        """
         return self.db_manager.find_many(
             self.collection_name,
             {"$or": [
                 {"coordinator_id": coordinator_id},
                 {"admins": coordinator_id}
-            ]}
+            ]},
+            projection=projection
         )
 
-    def list_participant_activities(self, participant_id: str) -> List[Dict]:
-        """Lista actividades de un participante."""
+    def list_participant_activities(self, participant_id: str,
+                                    projection: Optional[Dict] = _LIST_PROJECTION) -> List[Dict]:
+        """
+        Lista actividades de un participante.
+        
+        Por defecto omite change_log y participants; pasar projection=None
+        para obtener los documentos completos.
+        """
         return self.db_manager.find_many(
             self.collection_name,
-            {"participants": participant_id}
+            {"participants": participant_id},
+            projection=projection
         )
 
-    def search_activities(self, query: str) -> List[Dict]:
-        """Busca actividades por nombre o descripción."""
+    def search_activities(self, query: str,
+                          projection: Optional[Dict] = _SEARCH_PROJECTION) -> List[Dict]:
+        """
+        Busca actividades por nombre, descripción o ubicación.
+        
+        Usa el índice de texto ordenando por relevancia. Si la consulta contiene
+        metacaracteres de expresiones regulares, conserva la búsqueda por regex.
+        Por defecto solo devuelve id, name, location y status.
+        """
+        if _REGEX_METACHARS.search(query):
+            # Un único patrón compilado compartido por las tres cláusulas
+            pattern = re.compile(query, re.IGNORECASE)
+            return self.db_manager.find_many(
+                self.collection_name,
+                {
+                    "$or": [
+                        {"name": pattern},
+                        {"description": pattern},
+                        {"location": pattern}
+                    ]
+                },
+                projection=projection
+            )
+            
+        text_projection = dict(projection or {})
+        text_projection["score"] = {"$meta": "textScore"}
         return self.db_manager.find_many(
             self.collection_name,
-            {
-                "$or": [
-                    {"name": {"$regex": query, "$options": "i"}},
-                    {"description": {"$regex": query, "$options": "i"}},
-                    {"location": {"$regex": query, "$options": "i"}}
-                ]
-            }
+            {"$text": {"$search": query}},
+            projection=text_projection,
+            sort=[("score", {"$meta": "textScore"})]
         )
 
-    def get_pending_surveys(self) -> List[Dict]:
+    def get_pending_surveys(self,
+                            projection: Optional[Dict] = _LIST_PROJECTION) -> List[Dict]:
         """Obtiene actividades con encuestas pendientes."""
         return self.db_manager.find_many(
             self.collection_name,
             {
                 "status": ActivityStatus.IN_PROGRESS.value,
                 "surveys_ready": False
-            }
+            },
+            projection=projection
         )
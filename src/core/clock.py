@@ -0,0 +1,53 @@
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Tuple
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_DDMMYYYY_RE = re.compile(r'[0-9]{2}/[0-9]{2}/[0-9]{4}')
+
+# Último timestamp calculado: (milisegundo, datetime UTC, cadena ISO)
+_cached_now = [(-1, None, '')]
+
+def utcnow_cached() -> Tuple[datetime, str]:
+    """
+    Obtiene la hora actual en UTC reutilizando el valor calculado
+    si la llamada ocurre dentro del mismo milisegundo de reloj de pared
+    (agrupado con time.time_ns()).
+
+    El valor guardado conserva la precisión de microsegundos de la primera
+    llamada del milisegundo; las siguientes llamadas dentro de ese mismo
+    milisegundo devuelven exactamente ese timestamp.
+
+    Returns:
+        Tuple[datetime, str]: Fecha/hora UTC y su representación ISO
+    """
+    now_ns = time.time_ns()
+    bucket = now_ns // 1_000_000
+    cached = _cached_now[0]
+    if cached[0] == bucket:
+        return cached[1], cached[2]
+
+    now = _EPOCH + timedelta(microseconds=now_ns // 1000)
+    iso = now.isoformat()
+    _cached_now[0] = (bucket, now, iso)
+    return now, iso
+
+@lru_cache(maxsize=4096)
+def parse_ddmmyyyy(date_str: str) -> datetime:
+    """
+    Convierte una fecha DD/MM/YYYY a datetime UTC.
+    
+    Las fechas con el formato exacto se construyen directamente sin pasar
+    por strptime; el resto (p. ej. sin ceros a la izquierda) usa strptime.
+    Los resultados se cachean porque en cargas masivas se repiten fechas.
+    
+    Raises:
+        ValueError: Si la fecha no es válida
+    """
+    if _DDMMYYYY_RE.fullmatch(date_str):
+        return datetime(int(date_str[6:10]), int(date_str[3:5]), int(date_str[0:2]),
+                        tzinfo=timezone.utc)
+    return datetime.strptime(date_str, '%d/%m/%Y').replace(tzinfo=timezone.utc)
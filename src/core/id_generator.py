@@ -1,13 +1,36 @@
 import hashlib
-from datetime import datetime
 import re
 import unicodedata
+from .clock import parse_ddmmyyyy
+
+def _build_accent_map():
+    """Construye la tabla de traducción para eliminar acentos de caracteres latinos."""
+    table = {}
+    for code in range(0x0080, 0x0180):
+        char = chr(code)
+        decomposed = unicodedata.normalize('NFKD', char)
+        table[code] = ''.join(c for c in decomposed if ord(c) < 128)
+    return str.maketrans(table)
 
 class ParticipantIDGenerator:
     """
     Clase para generar y validar IDs únicos de participantes basados en su nombre y fecha de nacimiento.
     """
     
+    _CLEAN_RE = re.compile(r'[^a-z\s]')
+    _DATE_RE = re.compile(r'^\d{2}/\d{2}/\d{4}$')
+    _ACCENT_MAP = _build_accent_map()
+    
+    def __init__(self, use_blake2: bool = False):
+        """
+        Inicializa el generador de IDs.
+        
+        Args:
+            use_blake2 (bool): Usar BLAKE2b en lugar de SHA-256. Genera IDs distintos
+                a los ya almacenados, por lo que solo debe activarse en bases nuevas.
+        """
+        self.use_blake2 = use_blake2
+
     @staticmethod
     def clean_name(name):
         """
@@ -19,15 +42,16 @@ class ParticipantIDGenerator:
         Returns:
             str: Nombre limpio y normalizado
         """
-        # Convertir a minúsculas
-        name = name.lower()
+        # Convertir a minúsculas y eliminar acentos
+        name = name.lower().translate(ParticipantIDGenerator._ACCENT_MAP)
         
-        # Eliminar acentos y caracteres especiales
-        name = unicodedata.normalize('NFKD', name)
-        name = name.encode('ASCII', 'ignore').decode('ASCII')
+        # Caracteres fuera de la tabla: usar la normalización NFKD completa
+        if not name.isascii():
+            name = unicodedata.normalize('NFKD', name)
+            name = name.encode('ASCII', 'ignore').decode('ASCII')
         
         # Eliminar caracteres no alfabéticos y espacios extras
-        name = re.sub(r'[^a-z\s]', '', name)
+        name = ParticipantIDGenerator._CLEAN_RE.sub('', name)
         
         # Eliminar espacios múltiples y espacios al inicio/final
         name = ' '.join(name.split())
@@ -46,9 +70,9 @@ class ParticipantIDGenerator:
             bool: True si la fecha es válida, False en caso contrario
         """
         try:
-            if not re.match(r'^\d{2}/\d{2}/\d{4}$', date_str):
+            if not ParticipantIDGenerator._DATE_RE.match(date_str):
                 return False
-            datetime.strptime(date_str, '%d/%m/%Y')
+            parse_ddmmyyyy(date_str)
             return True
         except ValueError:
             return False
@@ -75,8 +99,12 @@ class ParticipantIDGenerator:
             raise ValueError("Formato de fecha incorrecto. Use DD/MM/YYYY")
             
         clean_name = self.clean_name(name)
-        combined = f"{clean_name}_{birth_date}"
+        combined = clean_name.encode() + b'_' + birth_date.encode()
+        
+        # BLAKE2b con digest de 4 bytes produce directamente 8 caracteres hex
+        if self.use_blake2:
+            return hashlib.blake2b(combined, digest_size=4).hexdigest()
         
         # Generar hash y tomar los primeros 8 caracteres
-        hash_object = hashlib.sha256(combined.encode())
+        hash_object = hashlib.sha256(combined)
         return hash_object.hexdigest()[:8]
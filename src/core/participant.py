@@ -1,11 +1,13 @@
 from typing import Dict, List, Optional, Set
-from datetime import datetime, timezone
 import logging
+from .clock import utcnow_cached
 from .id_generator import ParticipantIDGenerator  # Asegúrate de que esta importación sea correcta
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Generador compartido: no guarda estado por participante
+_ID_GENERATOR = ParticipantIDGenerator()
+
 class ParticipantError(Exception):
     """Excepción personalizada para errores relacionados con participantes."""
     pass
@@ -15,8 +17,15 @@ class Participant:
     Clase que representa un participante en Enlace Rural.
     Implementa la gestión de datos personales, actividades y respuestas de encuestas.
     """
+    __slots__ = (
+        'id_generator', 'id', 'name', 'birth_date', 'community',
+        'education_level', 'gender', 'income_level', 'dependents',
+        'activities', 'survey_responses', 'created_at', 'updated_at'
+    )
+    
     REQUIRED_FIELDS = {'name', 'birth_date', 'community'}
     UPDATABLE_FIELDS = {'education_level', 'gender', 'community', 'income_level', 'dependents'}
+    _REQUIRED_SURVEY_FIELDS = frozenset({'activity_id', 'date', 'responses'})
     
     def __init__(self, name: str, birth_date: str, community: str, 
                  education_level: Optional[str] = None, gender: Optional[str] = None,
@@ -37,7 +46,7 @@ class Participant:
             ParticipantError: Si los datos requeridos están ausentes o son inválidos
         """
         # Inicializar id_generator primero
-        self.id_generator = ParticipantIDGenerator()
+        self.id_generator = _ID_GENERATOR
         
         self._validate_required_fields(name, birth_date, community)
         
@@ -51,12 +60,13 @@ class Participant:
         self.dependents = dependents
         self.activities: Set[str] = set()
         self.survey_responses: List[Dict] = []
-        self.created_at = datetime.now(timezone.utc)
-        self.updated_at = datetime.now(timezone.utc)
+        now = utcnow_cached()[0]
+        self.created_at = now
+        self.updated_at = now
         
     def _validate_required_fields(self, name: str, birth_date: str, community: str) -> None:
         """Valida que los campos requeridos no estén vacíos."""
-        if not all([name, birth_date, community]):
+        if not (name and birth_date and community):
             raise ParticipantError("Todos los campos requeridos deben estar completos")
         
         if not self.id_generator.validate_date(birth_date):
@@ -73,14 +83,14 @@ class Participant:
         Raises:
             ParticipantError: Si se intenta actualizar un campo no permitido
         """
-        invalid_fields = set(kwargs.keys()) - self.UPDATABLE_FIELDS
-        if invalid_fields:
+        if not self.UPDATABLE_FIELDS.issuperset(kwargs):
+            invalid_fields = kwargs.keys() - self.UPDATABLE_FIELDS
             raise ParticipantError(f"Campos no actualizables: {invalid_fields}")
             
         for field, value in kwargs.items():
             setattr(self, field, value)
                 
-        self.updated_at = datetime.now(timezone.utc)
+        self.updated_at = utcnow_cached()[0]
         
     def join_activity(self, activity_id: str) -> None:
         """
@@ -93,7 +103,7 @@ class Participant:
             raise ParticipantError("ID de actividad no puede estar vacío")
             
         self.activities.add(activity_id)
-        self.updated_at = datetime.now(timezone.utc)
+        self.updated_at = utcnow_cached()[0]
         
     def leave_activity(self, activity_id: str) -> bool:
         """
@@ -107,7 +117,7 @@ class Participant:
         """
         if activity_id in self.activities:
             self.activities.remove(activity_id)
-            self.updated_at = datetime.now(timezone.utc)
+            self.updated_at = utcnow_cached()[0]
             return True
         return False
         
@@ -121,13 +131,13 @@ class Participant:
         Raises:
             ParticipantError: Si los datos de la encuesta están incompletos
         """
-        required_survey_fields = {'activity_id', 'date', 'responses'}
-        if not all(field in survey_data for field in required_survey_fields):
+        if not self._REQUIRED_SURVEY_FIELDS.issubset(survey_data):
             raise ParticipantError("Datos de encuesta incompletos")
             
-        survey_data['timestamp'] = datetime.now(timezone.utc)
+        now = utcnow_cached()[0]
+        survey_data['timestamp'] = now
         self.survey_responses.append(survey_data)
-        self.updated_at = datetime.now(timezone.utc)
+        self.updated_at = now
         
     def verify_data(self) -> Dict[str, bool]:
         """
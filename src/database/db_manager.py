@@ -1,15 +1,25 @@
 import logging
-from typing import Optional, Dict, List, Any, Union, Tuple
-from pymongo import MongoClient, ASCENDING, DESCENDING, IndexModel
+from typing import Optional, Dict, List, Any, Union, Tuple, Callable
+from pymongo import MongoClient, ASCENDING, DESCENDING, IndexModel, UpdateOne
+from pymongo.collection import Collection
+from pymongo.cursor import Cursor
+from pymongo.write_concern import WriteConcern
 from pymongo.errors import ServerSelectionTimeoutError, OperationFailure, AutoReconnect, DuplicateKeyError
 from bson.objectid import ObjectId
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+import math
+import random
 import time
-from datetime import datetime, timezone
+from datetime import date, datetime, time as time_of_day, timezone
 from bson import ObjectId
+from ..core.activity import ActivityStatus
 
 logger = logging.getLogger(__name__)
 
+# Tipos que se guardan tal cual en BSON y no necesitan recorrerse
+_BSON_LEAF_TYPES = frozenset({str, int, float, bool, type(None), datetime, ObjectId, bytes})
+
 class DatabaseError(Exception):
     """Excepción base para errores de base de datos."""
     pass
@@ -22,34 +32,60 @@ class OperationError(DatabaseError):
     """Error en operaciones de la base de datos."""
     pass
 
-def retry_on_disconnect(max_retries=3, delay=1):
+def _has_writable_server(client) -> bool:
+    """Indica si el driver ya descubrió un servidor que acepte escrituras."""
+    try:
+        return bool(client.topology_description.has_writable_server())
+    except Exception:
+        return False
+
+def _wait_for_server(client, wait_time: float, poll_interval: float) -> None:
+    """
+    Espera hasta wait_time segundos, terminando antes si el cliente
+    recupera un servidor disponible.
+    """
+    remaining = wait_time
+    for _ in range(math.ceil(wait_time / poll_interval)):
+        if client is not None and _has_writable_server(client):
+            return
+        step = min(poll_interval, remaining)
+        time.sleep(step)
+        remaining -= step
+
+def retry_on_disconnect(max_retries=3, delay=1, max_delay=10, poll_interval=0.05):
     """
     Decorador mejorado para reintentar operaciones en caso de desconexión.
+    
+    Usa backoff con jitter decorrelacionado y reintenta en cuanto el cliente
+    vuelve a tener un servidor disponible.
     """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            client = getattr(args[0], 'client', None) if args else None
+            previous_wait = delay
             for attempt in range(max_retries):
                 try:
                     return func(*args, **kwargs)
                 except AutoReconnect as e:
                     logger.warning(
-                        f"Intento {attempt + 1}/{max_retries} fallido para {func.__name__}"
+                        "Intento %s/%s fallido para %s", attempt + 1, max_retries, func.__name__
                     )
                     
                     if attempt == max_retries - 1:
                         logger.error(
-                            f"Máximo de reintentos alcanzado para {func.__name__}"
+                            "Máximo de reintentos alcanzado para %s", func.__name__
                         )
                         raise ConnectionError(
                             f"No se pudo reconectar después de {max_retries} intentos"
                         ) from e
                     
-                    wait_time = delay * (2 ** attempt)
-                    logger.info(f"Esperando {wait_time} segundos antes del siguiente intento")
-                    time.sleep(wait_time)
+                    wait_time = min(max_delay, random.uniform(delay, previous_wait * 3))
+                    previous_wait = wait_time
+                    logger.info("Esperando hasta %.2f segundos antes del siguiente intento", wait_time)
+                    _wait_for_server(client, wait_time, poll_interval)
                 except OperationFailure as e:
-                    logger.error(f"Error de operación en {func.__name__}: {str(e)}")
+                    logger.error("Error de operación en %s: %s", func.__name__, e)
                     raise OperationError(f"Error de operación: {str(e)}")
             
             raise ConnectionError(f"Error inesperado en reintentos de {func.__name__}")
@@ -64,31 +100,48 @@ class DatabaseManager:
                  username: str = "root",
                  password: str = "example",
                  database: str = "enlace_rural",
-                 max_pool_size: int = 50,
+                 max_pool_size: int = 200,
+                 min_pool_size: int = 10,
+                 max_idle_time_ms: int = 300000,
+                 socket_timeout_ms: int = 30000,
+                 enable_notes_search: bool = False,
                  client=None):
         """
         Inicializa la conexión con MongoDB o utiliza un cliente proporcionado.
+        
+        El pool mantiene min_pool_size conexiones abiertas para que la UI no
+        pague el handshake tras periodos inactivos, y admite hasta
+        max_pool_size escrituras concurrentes durante el procesamiento OCR.
+        
+        enable_notes_search crea el índice de texto sobre las notas de
+        survey_results; por defecto no se crea porque ninguna consulta lo usa
+        y encarece cada escritura.
         """
         self.host = host
         self.port = port
         self.database = database
+        self.max_pool_size = max_pool_size
+        self.enable_notes_search = enable_notes_search
         
         if client:
             self.client = client
             self.db = self.client[database]
+            self._collections = {}
             logger.info("Usando cliente MongoDB proporcionado")
         else:
-            self._connect(username, password, max_pool_size)
+            self._connect(username, password, max_pool_size, min_pool_size,
+                          max_idle_time_ms, socket_timeout_ms)
             
             # Validar conexión inicial solo si no es un cliente mockeado
             try:
                 self.client.server_info()
                 logger.info("Conexión inicial establecida exitosamente")
             except Exception as e:
-                logger.error(f"Error en la conexión inicial: {str(e)}")
+                logger.error("Error en la conexión inicial: %s", e)
                 raise ConnectionError(f"No se pudo establecer conexión inicial: {str(e)}")
 
-    def _connect(self, username: str, password: str, max_pool_size: int):
+    def _connect(self, username: str, password: str, max_pool_size: int,
+                 min_pool_size: int, max_idle_time_ms: int, socket_timeout_ms: int):
         """
         Establece la conexión con MongoDB.
         """
@@ -98,75 +151,127 @@ class DatabaseManager:
                 uri,
                 serverSelectionTimeoutMS=5000,
                 maxPoolSize=max_pool_size,
+                minPoolSize=min_pool_size,
+                maxIdleTimeMS=max_idle_time_ms,
+                socketTimeoutMS=socket_timeout_ms,
                 waitQueueTimeoutMS=2500,
                 connectTimeoutMS=2000,
                 retryWrites=True,
-                retryReads=True
+                retryReads=True,
+                # Compresión del protocolo: zstd si el servidor lo soporta,
+                # luego snappy y zlib como respaldo
+                compressors='zstd,snappy,zlib',
+                zlibCompressionLevel=6
             )
             self.db = self.client[self.database]
+            self._collections = {}
             
             # Verificar la conexión antes de crear índices
             self.client.server_info()
             self._ensure_indexes()
-            logger.info(f"Conexión a MongoDB establecida en {self.host}:{self.port}")
+            logger.info("Conexión a MongoDB establecida en %s:%s", self.host, self.port)
             
         except Exception as e:
-            logger.error(f"Error al conectar con MongoDB: {str(e)}")
+            logger.error("Error al conectar con MongoDB: %s", e)
             raise ConnectionError(f"No se pudo conectar a MongoDB: {str(e)}")
 
+    def _col(self, name: str) -> Collection:
+        """
+        Devuelve el objeto Collection, reutilizándolo entre llamadas.
+        
+        Construir un Collection con self.db[name] cuesta unos 6 µs.
+        """
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = self.db[name]
+        return collection
+
     def _ensure_indexes(self):
         """
         Asegura que existan los índices necesarios en las colecciones.
         """
-        try:
-            # Índices para activities
-            if 'activities' in self.db.list_collection_names():
-                self.db.activities.create_indexes([
-                    # Quitamos el índice de 'id' ya que usaremos '_id' que ya es único por defecto
-                    IndexModel([('coordinator_id', ASCENDING)]),
-                    IndexModel([('status', ASCENDING)]),
-                    IndexModel([('created_at', ASCENDING)]),
-                    IndexModel([('updated_at', ASCENDING)])
-                ])
-
-            # Índices para participants
-            if 'participants' in self.db.list_collection_names():
-                self.db.participants.create_indexes([
-                    # Quitamos el índice de 'id' ya que usaremos '_id' que ya es único por defecto
-                    IndexModel([('community', ASCENDING)]),
-                    IndexModel([('name', ASCENDING)]),
-                    IndexModel([('created_at', ASCENDING)])
-                ])
-            
-            # Índices para surveys
-            if 'surveys' in self.db.list_collection_names():
-                self.db.surveys.create_indexes([
-                    IndexModel([('participant_id', ASCENDING)]),
-                    IndexModel([('activity_id', ASCENDING)]),
-                    IndexModel([('date', ASCENDING)])
-                ])
-
-            # Nuevos índices para survey_results
-            if 'survey_results' in self.db.list_collection_names():
-                self.db.survey_results.create_indexes([
-                    IndexModel([('participant_id', ASCENDING)]),
-                    IndexModel([('activity_id', ASCENDING)]),
-                    IndexModel([('processed_at', ASCENDING)]),
-                    # Índice compuesto para búsquedas comunes
-                    IndexModel([
-                        ('activity_id', ASCENDING), 
-                        ('processed_at', ASCENDING)
-                    ]),
-                    # Índice para búsquedas por confianza
-                    IndexModel([('confidence', ASCENDING)]),
-                    # Índice de texto para búsquedas en notas
-                    IndexModel([('notes', 'text')])
+        indexes = {
+            'activities': [
+                # Quitamos el índice de 'id' ya que usaremos '_id' que ya es único por defecto
+                # Igualdad-Orden-Rango: coordinador y estado, luego más recientes
+                IndexModel([
+                    ('coordinator_id', ASCENDING),
+                    ('status', ASCENDING),
+                    ('updated_at', DESCENDING)
+                ]),
+                # Índice parcial: solo actividades abiertas, las únicas que se filtran por estado
+                IndexModel(
+                    [('status', ASCENDING)],
+                    name='status_open_idx',
+                    partialFilterExpression={'status': {'$in': [
+                        ActivityStatus.PENDING.value,
+                        ActivityStatus.IN_PROGRESS.value
+                    ]}}
+                ),
+                IndexModel([('created_at', ASCENDING)]),
+                IndexModel([('updated_at', ASCENDING)]),
+                # Índice de texto para búsquedas de actividades
+                IndexModel(
+                    [('name', 'text'), ('description', 'text'), ('location', 'text')],
+                    name='activity_text_idx',
+                    weights={'name': 5, 'location': 3, 'description': 1}
+                )
+            ],
+            'participants': [
+                # Quitamos el índice de 'id' ya que usaremos '_id' que ya es único por defecto
+                IndexModel([('community', ASCENDING)]),
+                IndexModel([('name', ASCENDING)]),
+                IndexModel([('created_at', ASCENDING)]),
+                # Índice multiclave para buscar y limpiar participantes por actividad
+                IndexModel([('activities', ASCENDING)])
+            ],
+            'surveys': [
+                IndexModel([('participant_id', ASCENDING)]),
+                IndexModel([('activity_id', ASCENDING)]),
+                IndexModel([('date', ASCENDING)])
+            ],
+            'survey_results': [
+                IndexModel([('processed_at', ASCENDING)]),
+                # Índices compuestos para búsquedas comunes (Igualdad-Orden-Rango);
+                # cubren también las búsquedas solo por activity_id o participant_id
+                IndexModel([
+                    ('activity_id', ASCENDING), 
+                    ('processed_at', ASCENDING)
+                ]),
+                IndexModel([
+                    ('activity_id', ASCENDING),
+                    ('confidence', DESCENDING),
+                    ('processed_at', ASCENDING)
+                ]),
+                IndexModel([
+                    ('participant_id', ASCENDING),
+                    ('activity_id', ASCENDING),
+                    ('processed_at', DESCENDING)
                 ])
+            ]
+        }
+        
+        if self.enable_notes_search:
+            # Índice de texto para búsquedas en notas
+            indexes['survey_results'].append(
+                IndexModel([('notes', 'text')], name='notes_text_idx', default_language='spanish')
+            )
+        
+        try:
+            # create_indexes es idempotente y crea la colección si no existe,
+            # así que se lanzan todas las colecciones en paralelo sin verificarlas
+            with ThreadPoolExecutor(max_workers=len(indexes)) as executor:
+                futures = [
+                    executor.submit(self._col(name).create_indexes, models)
+                    for name, models in indexes.items()
+                ]
+                for future in futures:
+                    future.result()
             
             logger.info("Índices verificados/creados exitosamente")
             
         except Exception as e:
-            logger.error(f"Error al crear índices: {str(e)}")
+            logger.error("Error al crear índices: %s", e)
             raise OperationError(f"Error al crear índices: {str(e)}")
 
     @retry_on_disconnect()
@@ -181,69 +286,231 @@ class DatabaseManager:
                 document['updated_at'] = document['created_at']
                 
             serialized = self._serialize_for_mongo(document)
-            result = self.db[collection].insert_one(serialized)
-            logger.info(f"Documento insertado exitosamente en {collection}")
+            result = self._col(collection).insert_one(serialized)
+            logger.info("Documento insertado exitosamente en %s", collection)
             return str(result.inserted_id)
             
         except (AutoReconnect, OperationFailure) as e:
             raise
         except DuplicateKeyError as e:
-            logger.error(f"Error de duplicado al insertar en {collection}: {str(e)}")
+            logger.error("Error de duplicado al insertar en %s: %s", collection, e)
             raise OperationError(f"Documento duplicado: {str(e)}")
         except Exception as e:
-            logger.error(f"Error al insertar documento en {collection}: {str(e)}")
+            logger.error("Error al insertar documento en %s: %s", collection, e)
             raise OperationError(f"Error al insertar documento: {str(e)}")
         
+    @retry_on_disconnect()
+    def insert_many(self, collection: str, documents: List[Dict],
+                    ordered: bool = False, batch_size: int = 1000,
+                    assume_new: bool = False) -> List[str]:
+        """
+        Inserta varios documentos con una petición por cada lote.
+        
+        Args:
+            collection: Nombre de la colección
+            documents: Documentos a insertar
+            ordered: Si se detiene en el primer error (por defecto continúa)
+            batch_size: Número máximo de documentos por petición
+            assume_new: Los documentos son nuevos (p. ej. resultados de OCR):
+                se asigna el _id en el cliente, se omite la validación de
+                esquema y se usa w=1. Con el _id fijo, un reintento tras una
+                desconexión no duplica documentos.
+            
+        Returns:
+            Lista de IDs insertados
+        """
+        try:
+            if not all(isinstance(document, dict) for document in documents):
+                raise OperationError("Todos los documentos deben ser diccionarios")
+            if not documents:
+                return []
+                
+            now = datetime.now(timezone.utc)
+            serialized = []
+            for document in documents:
+                if assume_new:
+                    document.setdefault('_id', ObjectId())
+                document.setdefault('created_at', now)
+                document.setdefault('updated_at', document['created_at'])
+                serialized.append(self._serialize_for_mongo(document))
+                
+            target = self._col(collection)
+            if assume_new:
+                target = target.with_options(write_concern=WriteConcern(w=1))
+                
+            inserted_ids = []
+            for start in range(0, len(serialized), batch_size):
+                result = target.insert_many(
+                    serialized[start:start + batch_size], ordered=ordered,
+                    bypass_document_validation=assume_new
+                )
+                inserted_ids.extend(str(inserted_id) for inserted_id in result.inserted_ids)
+            logger.info("%s documentos insertados en %s", len(inserted_ids), collection)
+            return inserted_ids
+            
+        except (AutoReconnect, OperationFailure) as e:
+            raise
+        except OperationError:
+            raise
+        except Exception as e:
+            logger.error("Error al insertar documentos en %s: %s", collection, e)
+            raise OperationError(f"Error al insertar documentos: {str(e)}")
+
+    @retry_on_disconnect()
+    def bulk_write(self, collection: str, operations: List[Any],
+                   ordered: bool = False) -> Dict[str, int]:
+        """
+        Ejecuta varias operaciones de escritura en una sola petición.
+        
+        Args:
+            collection: Nombre de la colección
+            operations: Operaciones de pymongo (InsertOne, UpdateOne, DeleteOne, ...)
+            ordered: Si se detiene en el primer error (por defecto continúa)
+            
+        Returns:
+            Conteo de documentos insertados, coincidentes, modificados, 
+            creados por upsert y eliminados
+        """
+        try:
+            if not operations:
+                return {'inserted': 0, 'matched': 0, 'modified': 0, 'upserted': 0, 'deleted': 0}
+                
+            result = self._col(collection).bulk_write(operations, ordered=ordered)
+            return {
+                'inserted': result.inserted_count,
+                'matched': result.matched_count,
+                'modified': result.modified_count,
+                'upserted': result.upserted_count,
+                'deleted': result.deleted_count
+            }
+        except (AutoReconnect, OperationFailure) as e:
+            raise
+        except Exception as e:
+            logger.error("Error en escritura masiva en %s: %s", collection, e)
+            raise OperationError(f"Error en escritura masiva: {str(e)}")
+
+    def bulk_upsert(self, collection: str, documents: List[Dict],
+                    filter_fn: Callable[[Dict], Dict]) -> Dict[str, int]:
+        """
+        Inserta o actualiza varios documentos en una sola petición.
+        
+        Args:
+            collection: Nombre de la colección
+            documents: Documentos a guardar
+            filter_fn: Función que devuelve el filtro de búsqueda de cada documento
+            
+        Returns:
+            Conteo de operaciones, igual que bulk_write
+        """
+        now = datetime.now(timezone.utc)
+        operations = []
+        for document in documents:
+            fields = self._serialize_for_mongo(document)
+            created_at = fields.pop('created_at', now)
+            fields['updated_at'] = fields.get('updated_at', now)
+            operations.append(UpdateOne(
+                filter_fn(document),
+                {'$set': fields, '$setOnInsert': {'created_at': created_at}},
+                upsert=True
+            ))
+        return self.bulk_write(collection, operations)
+        
     def _serialize_for_mongo(self, document):
-        """Serializa documentos para MongoDB"""
-        if isinstance(document, dict):
+        """
+        Serializa documentos para MongoDB.
+        
+        BSON no admite date sin hora: se convierten a datetime a medianoche.
+        Los valores escalares, que son la mayoría, salen en la primera comprobación.
+        """
+        value_type = type(document)
+        if value_type in _BSON_LEAF_TYPES:
+            return document
+        if value_type is dict or isinstance(document, dict):
             return {k: self._serialize_for_mongo(v) for k, v in document.items()}
-        elif isinstance(document, (list, tuple)):
+        if value_type is list or isinstance(document, (list, tuple)):
             return [self._serialize_for_mongo(x) for x in document]
-        elif isinstance(document, datetime.date):
-            return datetime.datetime.combine(document, datetime.datetime.min.time())
+        if isinstance(document, date) and not isinstance(document, datetime):
+            return datetime.combine(document, time_of_day.min)
         return document
         
     
     @retry_on_disconnect()
-    def find_many(self, collection: str, query: Dict) -> List[Dict]:
+    def find_many(self, collection: str, query: Dict,
+                  projection: Optional[Dict] = None,
+                  sort: Optional[List[Tuple[str, Any]]] = None,
+                  batch_size: int = 1000,
+                  limit: Optional[int] = None,
+                  hint: Optional[Union[str, List[Tuple[str, Any]]]] = None) -> List[Dict]:
         """
         Encuentra múltiples documentos en una colección.
         
         Args:
             collection: Nombre de la colección
             query: Criterios de búsqueda
+            projection: Campos a devolver (opcional)
+            sort: Lista de pares (campo, dirección) para ordenar (opcional)
+            batch_size: Documentos por lote del cursor
+            limit: Número máximo de documentos a devolver (opcional)
+            hint: Nombre o claves del índice que debe usar la consulta (opcional)
             
         Returns:
             Lista de documentos encontrados
         """
         try:
-            cursor = self.db[collection].find(query)
+            cursor = self._col(collection).find(query, projection).batch_size(batch_size)
+            if hint:
+                cursor = cursor.hint(hint)
+            if sort:
+                cursor = cursor.sort(sort)
+            if limit:
+                cursor = cursor.limit(limit)
             return list(cursor)
         except (AutoReconnect, OperationFailure) as e:
             raise
         except Exception as e:
-            logger.error(f"Error al buscar documentos en {collection}: {str(e)}")
+            logger.error("Error al buscar documentos en %s: %s", collection, e)
             raise OperationError(f"Error al buscar documentos: {str(e)}")
 
+    def find_cursor(self, collection: str, query: Dict,
+                    projection: Optional[Dict] = None,
+                    sort: Optional[List[Tuple[str, Any]]] = None,
+                    batch_size: int = 1000) -> Cursor:
+        """
+        Devuelve el cursor de una búsqueda sin materializar los resultados,
+        para recorrerlos por lotes sin cargar todos en memoria.
+        
+        El cursor es perezoso: la consulta se envía al pedir el primer
+        documento, por lo que los errores de red aparecen al iterarlo.
+        """
+        cursor = self._col(collection).find(query, projection).batch_size(batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        return cursor
+
     @retry_on_disconnect()
-    def find_one(self, collection: str, query: Dict) -> Optional[Dict]:
+    def find_one(self, collection: str, query: Dict,
+                 projection: Optional[Dict] = None,
+                 hint: Optional[Union[str, List[Tuple[str, Any]]]] = None) -> Optional[Dict]:
         """
         Encuentra un documento en una colección.
         
         Args:
             collection: Nombre de la colección
             query: Criterios de búsqueda
+            projection: Campos a devolver (opcional)
+            hint: Nombre o claves del índice que debe usar la consulta (opcional)
             
         Returns:
             Documento encontrado o None
         """
         try:
-            return self.db[collection].find_one(query)
+            if hint:
+                return self._col(collection).find_one(query, projection, hint=hint)
+            return self._col(collection).find_one(query, projection)
         except (AutoReconnect, OperationFailure) as e:
             raise
         except Exception as e:
-            logger.error(f"Error al buscar documento en {collection}: {str(e)}")
+            logger.error("Error al buscar documento en %s: %s", collection, e)
             raise OperationError(f"Error al buscar documento: {str(e)}")
 
     @retry_on_disconnect()
@@ -265,14 +532,42 @@ class DatabaseManager:
                     update['$set'] = {}
                 update['$set']['updated_at'] = datetime.now(timezone.utc)
                 
-            result = self.db[collection].update_one(query, update)
+            result = self._col(collection).update_one(query, update)
             return result.modified_count > 0
         except (AutoReconnect, OperationFailure) as e:
             raise
         except Exception as e:
-            logger.error(f"Error al actualizar documento en {collection}: {str(e)}")
+            logger.error("Error al actualizar documento en %s: %s", collection, e)
             raise OperationError(f"Error al actualizar documento: {str(e)}")
 
+    @retry_on_disconnect()
+    def update_many(self, collection: str, query: Dict, update: Dict) -> int:
+        """
+        Actualiza todos los documentos que coinciden con la consulta
+        en una sola operación.
+        
+        Args:
+            collection: Nombre de la colección
+            query: Criterios de búsqueda
+            update: Modificaciones a realizar
+            
+        Returns:
+            Número de documentos modificados
+        """
+        try:
+            if 'updated_at' not in update.get('$set', {}):
+                if '$set' not in update:
+                    update['$set'] = {}
+                update['$set']['updated_at'] = datetime.now(timezone.utc)
+                
+            result = self._col(collection).update_many(query, update)
+            return result.modified_count
+        except (AutoReconnect, OperationFailure) as e:
+            raise
+        except Exception as e:
+            logger.error("Error al actualizar documentos en %s: %s", collection, e)
+            raise OperationError(f"Error al actualizar documentos: {str(e)}")
+
     @retry_on_disconnect()
     def delete_one(self, collection: str, query: Dict) -> bool:
         """
@@ -286,12 +581,12 @@ class DatabaseManager:
             True si se eliminó algún documento, False en caso contrario
         """
         try:
-            result = self.db[collection].delete_one(query)
+            result = self._col(collection).delete_one(query)
             return result.deleted_count > 0
         except (AutoReconnect, OperationFailure) as e:
             raise
         except Exception as e:
-            logger.error(f"Error al eliminar documento en {collection}: {str(e)}")
+            logger.error("Error al eliminar documento en %s: %s", collection, e)
             raise OperationError(f"Error al eliminar documento: {str(e)}")
 
     @retry_on_disconnect()
@@ -307,19 +602,43 @@ class DatabaseManager:
             Número de documentos que coinciden
         """
         try:
-            return self.db[collection].count_documents(query)
+            return self._col(collection).count_documents(query)
         except (AutoReconnect, OperationFailure) as e:
             raise
         except Exception as e:
-            logger.error(f"Error al contar documentos en {collection}: {str(e)}")
+            logger.error("Error al contar documentos en %s: %s", collection, e)
             raise OperationError(f"Error al contar documentos: {str(e)}")
 
+    def aggregate(self, collection: str, pipeline: List[Dict]) -> List[Dict]:
+        """
+        Ejecuta un pipeline de agregación en el servidor.
+        
+        Args:
+            collection: Nombre de la colección
+            pipeline: Lista de etapas de agregación
+            
+        Returns:
+            Documentos resultantes del pipeline
+        """
+        try:
+            return list(self._col(collection).aggregate(pipeline))
+        except (AutoReconnect, OperationFailure) as e:
+            raise
+        except Exception as e:
+            logger.error("Error al agregar documentos en %s: %s", collection, e)
+            raise OperationError(f"Error al agregar documentos: {str(e)}")
+
 
-    def __del__(self):
-        """Cierra la conexión cuando el objeto es destruido."""
+    def close(self) -> None:
+        """Cierra la conexión con MongoDB."""
         try:
-            if hasattr(self, 'client'):
-                self.client.close()
-                logger.info("Conexión a MongoDB cerrada")
+            self.client.close()
+            logger.info("Conexión a MongoDB cerrada")
         except Exception as e:
-            logger.error(f"Error al cerrar conexión: {str(e)}")
\ No newline at end of file
+            logger.error("Error al cerrar conexión: %s", e)
+
+    def __enter__(self) -> 'DatabaseManager':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
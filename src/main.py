@@ -1,23 +1,41 @@
 # src/main.py
 import sys
 import asyncio
+import logging
 import qasync
 from PyQt6.QtWidgets import QApplication
 from src.ui.main_window import MainWindow
 
-async def main():
+logger = logging.getLogger(__name__)
+
+def _report_loading_error(task: asyncio.Task) -> None:
+    """Registra el error de la carga inicial, que de otro modo se perdería"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Error al cargar las actividades", exc_info=task.exception())
+
+def main():
     app = QApplication(sys.argv)
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    
     window = MainWindow()
     window.show()
-    await window.activity_view.load_activities()
-    
-    # Cambiado .exec() por .run_forever()
-    await qasync.QEventLoop(app).run_forever()
+    try:
+        with loop:
+            # Las actividades se cargan mientras la ventana ya se está pintando;
+            # se guarda la referencia para que la tarea no sea recolectada
+            loading = loop.create_task(window.activity_view.load_activities())
+            loading.add_done_callback(_report_loading_error)
+            loop.run_forever()
+    finally:
+        # Único punto de cierre de la conexión, se cierre o no la ventana
+        window.data_manager.close()
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     try:
         if sys.platform == 'win32':
             asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-        asyncio.run(main())
+        main()
     except KeyboardInterrupt:
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(0)
@@ -1,20 +1,32 @@
 # src/ocr/batch_processor.py
 
+import os
 import re
 import cv2
+import queue
 import logging
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from .preprocessor import ImagePreprocessor
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from .preprocessor import ImagePreprocessor, load_grayscale, decode_grayscale
 import numpy as np
 import pytesseract
 from .scanner import SurveyScanner
 
 logger = logging.getLogger(__name__)
 
+_PARTICIPANT_ID_RE = re.compile(r'ID_PARTICIPANTE\s*(\d+)')
+# Línea de opción: número seguido opcionalmente de espacios o guiones bajos
+_OPTION_LINE_RE = re.compile(r'(\d+)[\s_]*$')
+
 class BatchProcessor:
+   # Margen vertical (px) alrededor de cada línea al buscar marcas
+   LINE_MARGIN = 5
+   # Píxeles de tinta a partir de los cuales se considera que hay una marca
+   MIN_MARK_PIXELS = 50
+
    def __init__(self):
        self.preprocessor = ImagePreprocessor()
        self.scanner = SurveyScanner()
@@ -23,8 +35,10 @@ class BatchProcessor:
        try:
            processed_image = self.preprocessor.preprocess_image(image_path)
            
-           participant_id = self._extract_participant_id(processed_image)
-           responses = self._process_responses(processed_image) 
+           # Se mejora la imagen una sola vez para el encabezado y las respuestas
+           enhanced = self.preprocessor._enhance_text_region(processed_image)
+           participant_id = self._extract_participant_id(processed_image, enhanced)
+           responses = self._process_responses(processed_image, enhanced)
            confidence = self._calculate_confidence(responses)
            
            return {
@@ -38,14 +52,16 @@ class BatchProcessor:
            logger.error(f"Error procesando imagen {image_path}: {e}")
            raise
            
-   def _extract_participant_id(self, image) -> str:
+   def _extract_participant_id(self, image, enhanced: Optional[np.ndarray] = None) -> str:
        try:
-           height = image.shape[0]
-           header_region = image[0:int(height * 0.2), :]
-           enhanced = self.preprocessor._enhance_text_region(header_region)
+           header_height = int(image.shape[0] * 0.2)
+           if enhanced is None:
+               enhanced = self.preprocessor._enhance_text_region(image[0:header_height, :])
+           else:
+               enhanced = enhanced[0:header_height, :]
            header_text = self.scanner._process_text(enhanced)
            
-           match = re.search(r'ID_PARTICIPANTE\s*(\d+)', header_text)
+           match = _PARTICIPANT_ID_RE.search(header_text)
            if match:
                return match.group(1).strip()
            return ""
@@ -54,16 +70,16 @@ class BatchProcessor:
            logger.error(f"Error extrayendo ID: {e}")
            return ""
 
-   def _process_responses(self, image) -> Dict[str, str]:
+   def _process_responses(self, image, enhanced: Optional[np.ndarray] = None) -> Dict[str, str]:
        try:
            responses = {}
-           enhanced_image = self.preprocessor._enhance_text_region(image)
-           text = self.scanner._process_text(enhanced_image)
+           if enhanced is None:
+               enhanced = self.preprocessor._enhance_text_region(image)
+           lines = self.scanner._process_lines(enhanced)
            
-           lines = text.split('\n')
            current_question = None
            
-           for line in lines:
+           for line, top, bottom in lines:
                line = line.strip()
                
                if '$' in line:
@@ -73,10 +89,12 @@ class BatchProcessor:
                    current_question = question_text
                    continue
                
-               if current_question and re.match(r'^\d+[\s_]*$', line):
-                   num = re.match(r'^\d+', line).group()
-                   region = self._get_line_region(image, line)
-                   if region is not None and self._detect_mark(region):
+               option = _OPTION_LINE_RE.match(line) if current_question else None
+               if option:
+                   num = option.group(1)
+                   # La línea ya trae su posición: se recorta directamente
+                   region = image[max(top - self.LINE_MARGIN, 0):bottom + self.LINE_MARGIN, :]
+                   if self._detect_mark(region):
                        if current_question not in responses:
                            responses[current_question] = []
                        responses[current_question].append(num)
@@ -86,22 +104,6 @@ class BatchProcessor:
        except Exception as e:
            logger.error(f"Error procesando respuestas: {e}")
            return {}
-
-   def _get_line_region(self, image: np.ndarray, line_text: str) -> Optional[np.ndarray]:
-       try:
-           height = image.shape[0]
-           section_height = 50
-           
-           for i in range(0, height, section_height):
-               section = image[i:min(i + section_height, height), :]
-               section_text = self.scanner._process_text(section)
-               if line_text in section_text:
-                   return section
-           return None
-           
-       except Exception as e:
-           logger.error(f"Error obteniendo región de línea: {e}")
-           return None
        
    def _calculate_confidence(self, responses: Dict[str, str]) -> float:
        try:
@@ -120,30 +122,122 @@ class BatchProcessor:
            if image_region is None or image_region.size == 0:
                return False
 
+           # Tras el umbral la tinta queda en 0: basta contar píxeles oscuros
            enhanced = self.preprocessor._enhance_marks_region(image_region)
-           contours, _ = cv2.findContours(enhanced, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-           
-           for contour in contours:
-               area = cv2.contourArea(contour)
-               if area > 50:
-                   return True
-           return False
+           ink_pixels = enhanced.size - cv2.countNonZero(enhanced)
+           return ink_pixels > self.MIN_MARK_PIXELS
            
        except Exception as e:
            logger.error(f"Error detectando marca: {e}")
            return False
 
 
+# Preprocesador de cada proceso worker; se crea al primer uso
+_worker_preprocessor: Optional[ImagePreprocessor] = None
+
+def _init_worker(min_quality_score: float) -> None:
+    """Crea el preprocesador del proceso worker con el umbral de calidad del padre."""
+    global _worker_preprocessor
+    _worker_preprocessor = ImagePreprocessor(min_quality_score=min_quality_score)
+
+def _process_image_file(img_path: Path, output_dir: Path,
+                        preprocessor: Optional[ImagePreprocessor] = None,
+                        data: Optional[bytes] = None) -> Optional[Dict]:
+    """
+    Preprocesa una imagen y guarda el resultado en output_dir.
+    
+    Es una función de módulo para poder enviarla a un ProcessPoolExecutor;
+    dentro de un worker reutiliza un único ImagePreprocessor por proceso.
+    Si se reciben los bytes ya leídos del archivo, solo se decodifican.
+    
+    Returns:
+        Dict con nombre, calidad y ruta de salida, o None si la imagen
+        no se pudo cargar o su calidad es insuficiente
+    """
+    global _worker_preprocessor
+    if preprocessor is None:
+        if _worker_preprocessor is None:
+            _worker_preprocessor = ImagePreprocessor()
+        preprocessor = _worker_preprocessor
+        
+    try:
+        image = load_grayscale(img_path) if data is None else decode_grayscale(data)
+        if image is None:
+            logger.warning(f"No se pudo cargar la imagen: {img_path.name}")
+            return None
+            
+        measures = preprocessor._measure(image)
+        quality = preprocessor._quality_score(measures, image.shape)
+        if quality < preprocessor.min_quality_score:
+            logger.warning(f"Calidad de imagen insuficiente ({quality:.2f}): {img_path.name}")
+            return None
+            
+        processed = preprocessor._process_steps(image, measures['contrast'])
+        output_path = output_dir / f"processed_{img_path.name}"
+        cv2.imwrite(str(output_path), processed)
+        
+        return {
+            'filename': img_path.name,
+            'quality': quality,
+            'output_path': str(output_path)
+        }
+    except Exception as e:
+        logger.error(f"Error procesando {img_path.name}: {str(e)}")
+        return None
+
+
+def _prefetch_files(paths: List[Path], depth: int = 4) -> Iterator[Tuple[Path, Optional[bytes]]]:
+    """
+    Lee los archivos en un hilo aparte mientras el llamador procesa los anteriores.
+    
+    Args:
+        paths: Archivos a leer, en orden
+        depth: Máximo de archivos leídos por adelantado
+        
+    Yields:
+        Tuple[Path, Optional[bytes]]: Ruta y contenido (None si no se pudo leer)
+    """
+    pending: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    
+    def reader() -> None:
+        for path in paths:
+            if stop.is_set():
+                break
+            try:
+                data = path.read_bytes()
+            except OSError as e:
+                logger.warning(f"No se pudo leer {path.name}: {e}")
+                data = None
+            pending.put((path, data))
+        pending.put(None)
+        
+    thread = threading.Thread(target=reader, name="image-prefetch", daemon=True)
+    thread.start()
+    try:
+        while (item := pending.get()) is not None:
+            yield item
+    finally:
+        # Si el consumo se interrumpe, liberar la cola para que el lector termine
+        stop.set()
+        while thread.is_alive():
+            try:
+                pending.get_nowait()
+            except queue.Empty:
+                thread.join(0.01)
+
+
 class SimpleBatchProcessor:
     """Clase para procesar múltiples imágenes en una carpeta."""
     
-    def __init__(self, input_dir: str, output_dir: str):
+    def __init__(self, input_dir: str, output_dir: str, max_workers: Optional[int] = None):
         """
         Inicializa el procesador batch.
         
         Args:
             input_dir: Directorio con las imágenes a procesar
             output_dir: Directorio donde guardar las imágenes procesadas
+            max_workers: Procesos para el modo paralelo (por defecto, uno por CPU)
             
         Raises:
             FileNotFoundError: Si el directorio de entrada no existe
@@ -159,6 +253,7 @@ class SimpleBatchProcessor:
             raise NotADirectoryError(f"Input path is not a directory: {input_dir}")
             
         self.preprocessor = ImagePreprocessor()
+        self.max_workers = max_workers or os.cpu_count()
         
         # Crear directorio de salida si no existe
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -174,10 +269,13 @@ class SimpleBatchProcessor:
         Returns:
             Dict: Resultados del procesamiento
         """
-        # Recopilar archivos a procesar
-        image_files = []
-        for ext in extensions:
-            image_files.extend(self.input_dir.glob(f'*{ext}'))
+        # Recopilar archivos a procesar en un solo recorrido del directorio
+        suffixes = {ext.lower() for ext in extensions}
+        with os.scandir(self.input_dir) as entries:
+            image_files = sorted(
+                Path(entry.path) for entry in entries
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in suffixes
+            )
         
         if not image_files:
             logger.info(f"No se encontraron imágenes en {self.input_dir}")
@@ -194,27 +292,34 @@ class SimpleBatchProcessor:
         }
 
         if parallel:
-            # Procesamiento en paralelo
-            with ThreadPoolExecutor() as executor:
-                futures = {executor.submit(self._process_image, img_path): img_path for img_path in image_files}
-                for future in as_completed(futures):
-                    img_path = futures[future]
-                    try:
-                        result = future.result()
-                        if result:
-                            results['successful'] += 1
-                            results['processed_images'].append(result)
-                        else:
-                            results['failed'] += 1
-                            results['failed_files'].append(str(img_path))
-                    except Exception as e:
-                        logger.error(f"Error procesando {img_path.name}: {str(e)}")
+            # Procesamiento en paralelo: OpenCV y Tesseract usan CPU, por lo que
+            # se reparten entre procesos en lugar de hilos
+            # Se envían varias imágenes por tarea para reducir la comunicación entre procesos
+            chunksize = max(1, len(image_files) // (4 * self.max_workers))
+            # Un solo pool por lote: los procesos se inicializan una vez y se
+            # detienen al terminar, aunque ocurra un error
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.preprocessor.min_quality_score,)
+            ) as executor:
+                processed = executor.map(
+                    _process_image_file,
+                    image_files,
+                    [self.output_dir] * len(image_files),
+                    chunksize=chunksize
+                )
+                for img_path, result in zip(image_files, processed):
+                    if result:
+                        results['successful'] += 1
+                        results['processed_images'].append(result)
+                    else:
                         results['failed'] += 1
                         results['failed_files'].append(str(img_path))
         else:
-            # Procesamiento secuencial
-            for img_path in image_files:
-                result = self._process_image(img_path)
+            # Procesamiento secuencial: la lectura del disco se solapa con el procesamiento
+            for img_path, data in _prefetch_files(image_files):
+                result = self._process_image(img_path, data)
                 if result:
                     results['successful'] += 1
                     results['processed_images'].append(result)
@@ -227,6 +332,10 @@ class SimpleBatchProcessor:
         
         return results
 
+    def _process_image(self, img_path: Path, data: Optional[bytes] = None) -> Optional[Dict]:
+        """Procesa una imagen en el proceso actual."""
+        return _process_image_file(img_path, self.output_dir, self.preprocessor, data)
+
     def process_image(self, image_path: str) -> Dict[str, Any]:
         try:
             processed_image = self.preprocessor.preprocess_image(image_path)
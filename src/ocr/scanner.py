@@ -25,12 +25,22 @@ class SurveyScanner:
     
     VALID_FIELD_TYPES = ['text', 'checkbox', 'number']
     
+    # Separación en blanco entre regiones al componer la imagen para Tesseract
+    OCR_GUTTER = 20
+    
     # src/ocr/scanner.py
 
     def __init__(self, template_path: Optional[str] = None):
         self.logger = logging.getLogger(__name__)
         self.template = self._load_template(template_path) if template_path else None
         self.fields: List[SurveyField] = []
+        self.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        
+        # Los keypoints del template se calculan una sola vez para todas las encuestas
+        if self.template is not None:
+            self._orb = cv2.ORB_create(nfeatures=2000)
+            self._template_kp, self._template_des = self._orb.detectAndCompute(self.template, None)
+            self._matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)
         
         # Configurar Tesseract con la ruta correcta
         pytesseract.pytesseract.tesseract_cmd = '/usr/local/bin/tesseract'  # Cambiado de /opt/homebrew/bin/tesseract
@@ -106,9 +116,12 @@ class SurveyScanner:
             if isinstance(image, str):
                 if not Path(image).exists():
                     raise ScannerError(f"Archivo no encontrado: {image}")
-                image_array = cv2.imread(image)
+                image_array = cv2.imread(image, cv2.IMREAD_GRAYSCALE)
                 if image_array is None:
                     raise ScannerError(f"No se pudo cargar la imagen: {image}")
+            elif len(image.shape) == 3:
+                # Se convierte una sola vez; campos y alineación trabajan en grises
+                image_array = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             else:
                 image_array = image
                     
@@ -118,10 +131,17 @@ class SurveyScanner:
             else:
                 aligned = image_array
                 
+            # Los campos de texto se leen con una sola llamada a Tesseract
+            text_fields = [f for f in self.fields if f.field_type != 'checkbox']
+            texts = {}
+            if len(text_fields) > 1:
+                rois = [self._get_field_roi(aligned, f) for f in text_fields]
+                texts = dict(zip((f.name for f in text_fields), self._process_text_batch(rois)))
+                
             # Extraer datos de cada campo
             results = {}
             for field in self.fields:
-                value = self._extract_field_value(aligned, field)
+                value = self._extract_field_value(aligned, field, texts.get(field.name))
                 results[field.name] = value
                 
             return results
@@ -135,145 +155,129 @@ class SurveyScanner:
         Alinea la imagen con el template usando feature matching.
         
         Args:
-            image: Imagen a alinear
+            image: Imagen a alinear, en escala de grises
             
         Returns:
             np.ndarray: Imagen alineada
         """
-        # Convertir a escala de grises si es necesario
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image
-            
-        # Detectar keypoints
-        sift = cv2.SIFT_create()
-        kp1, des1 = sift.detectAndCompute(self.template, None)
-        kp2, des2 = sift.detectAndCompute(gray, None)
+        # Detectar keypoints (ORB: descriptores binarios comparados por Hamming)
+        kp1, des1 = self._template_kp, self._template_des
+        kp2, des2 = self._orb.detectAndCompute(image, None)
         
         if des1 is None or des2 is None:
             return image
         
         # Matching
-        FLANN_INDEX_KDTREE = 1
-        index_params = dict(algorithm=FLANN_INDEX_KDTREE, trees=5)
-        search_params = dict(checks=50)
-        flann = cv2.FlannBasedMatcher(index_params, search_params)
-        matches = flann.knnMatch(des1, des2, k=2)
+        matches = self._matcher.knnMatch(des1, des2, k=2)
         
         # Filtrar buenos matches
         good = []
-        for m, n in matches:
-            if m.distance < 0.7 * n.distance:
-                good.append(m)
+        for pair in matches:
+            if len(pair) == 2 and pair[0].distance < 0.75 * pair[1].distance:
+                good.append(pair[0])
                 
         # Encontrar homografía
         if len(good) > 10:
             src_pts = np.float32([kp1[m.queryIdx].pt for m in good]).reshape(-1, 1, 2)
             dst_pts = np.float32([kp2[m.trainIdx].pt for m in good]).reshape(-1, 1, 2)
             
+            # M lleva del template a la imagen; se aplica inversa para
+            # llevar la imagen al sistema de coordenadas del template
             M, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
             if M is not None:
                 h, w = self.template.shape
-                aligned = cv2.warpPerspective(image, M, (w, h))
+                aligned = cv2.warpPerspective(image, M, (w, h), flags=cv2.WARP_INVERSE_MAP)
                 return aligned
             
         return image
         
-    def _extract_field_value(self, image: np.ndarray, field: SurveyField) -> str:
+    def _get_field_roi(self, image: np.ndarray, field: SurveyField) -> np.ndarray:
+        """Recorta la región de la imagen que ocupa el campo."""
+        x, y, w, h = field.box_coordinates
+        return image[y:y+h, x:x+w]
+        
+    def _extract_field_value(self, image: np.ndarray, field: SurveyField,
+                             text: Optional[str] = None) -> str:
         """
         Extrae el valor de un campo específico.
         
         Args:
             image: Imagen de la encuesta
             field: Campo a extraer
+            text: Texto ya reconocido para el campo (opcional)
             
         Returns:
             str: Valor extraído
         """
-        x, y, w, h = field.box_coordinates
-        roi = image[y:y+h, x:x+w]
-        
         if field.field_type == 'checkbox':
-            return self._process_checkbox(roi, field.options)
-        elif field.field_type == 'number':
-            text = self._process_text(roi)
+            return self._process_checkbox(self._get_field_roi(image, field), field.options)
+            
+        if text is None:
+            text = self._process_text(self._get_field_roi(image, field))
+            
+        if field.field_type == 'number':
             # Intentar extraer solo números
             numbers = ''.join(filter(str.isdigit, text))
             return numbers if numbers else ''
-        else:
-            return self._process_text(roi)
+        return text
             
     def _process_checkbox(self, roi: np.ndarray, options: List[str]) -> str:
         """
         Procesa región de checkboxes y determina cual está marcado.
         
         Args:
-            roi: Región de interés de la imagen
+            roi: Región de interés de la imagen, en escala de grises
             options: Lista de opciones posibles
             
         Returns:
             str: Opciones marcadas
         """
-        # Convertir a escala de grises si es necesario
-        if len(roi.shape) == 3:
-            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = roi
-            
         # Binarizar
-        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        _, binary = cv2.threshold(roi, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         
-        # Encontrar contornos
-        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Píxeles marcados por fila, acumulados para sumar cada franja
+        # de opción con una resta en lugar de recorrer la región
+        ink_per_row = np.count_nonzero(binary == 0, axis=1)
+        cumulative = np.concatenate(([0], np.cumsum(ink_per_row)))
         
-        # Analizar cada checkbox
-        checked = []
+        # Límites de la franja de cada opción y píxeles marcados en ella
         height_per_option = roi.shape[0] / len(options)
+        edges = (np.arange(len(options) + 1) * height_per_option).astype(int)
+        marked_pixels = cumulative[edges[1:]] - cumulative[edges[:-1]]
+        region_sizes = np.diff(edges) * binary.shape[1]
         
-        for i, option in enumerate(options):
-            y_start = int(i * height_per_option)
-            y_end = int((i + 1) * height_per_option)
-            
-            # Contar píxeles marcados en esta región
-            region = binary[y_start:y_end, :]
-            marked_pixels = np.count_nonzero(region == 0)
-            
-            if marked_pixels > (region.size * 0.2):  # Umbral de 20%
-                checked.append(option)
+        # Umbral de 20%
+        checked = [option for option, marked in zip(options, marked_pixels > region_sizes * 0.2) if marked]
                 
         return ", ".join(checked) if checked else ""
         
+    def _binarize_for_ocr(self, roi: np.ndarray) -> np.ndarray:
+        """Mejora el contraste de la región en escala de grises y la binariza."""
+        # Mejorar contraste
+        enhanced = self.clahe.apply(roi)
+        
+        # Aplicar umbral adaptativo
+        return cv2.adaptiveThreshold(
+            enhanced,
+            255,
+            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY,
+            11,
+            2
+        )
+
     def _process_text(self, roi: np.ndarray) -> str:
         """
         Procesa región de texto usando Tesseract.
         
         Args:
-            roi: Región de interés de la imagen
+            roi: Región de interés de la imagen, en escala de grises
             
         Returns:
             str: Texto extraído
         """
         try:
-            # Asegurar que la imagen está en escala de grises
-            if len(roi.shape) == 3:
-                gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = roi
-                
-            # Mejorar contraste
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-            enhanced = clahe.apply(gray)
-            
-            # Aplicar umbral adaptativo
-            binary = cv2.adaptiveThreshold(
-                enhanced,
-                255,
-                cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                cv2.THRESH_BINARY,
-                11,
-                2
-            )
+            binary = self._binarize_for_ocr(roi)
             
             # Procesar con Tesseract
             text = pytesseract.image_to_string(binary, config=self.tesseract_config)
@@ -281,4 +285,109 @@ class SurveyScanner:
             
         except Exception as e:
             self.logger.error(f"Error en OCR: {str(e)}")
-            return ""
\ No newline at end of file
+            return ""
+
+    def _process_text_batch(self, rois: List[np.ndarray]) -> List[str]:
+        """
+        Procesa varias regiones de texto con una sola llamada a Tesseract.
+        
+        Las regiones binarizadas se apilan en una imagen separadas por franjas
+        en blanco y cada palabra reconocida se asigna a la región que contiene
+        su centro vertical.
+        
+        Args:
+            rois: Regiones de interés de la imagen
+            
+        Returns:
+            List[str]: Texto extraído por región, en el mismo orden
+        """
+        texts = [''] * len(rois)
+        try:
+            binaries = [(i, self._binarize_for_ocr(roi)) for i, roi in enumerate(rois) if roi.size]
+            if not binaries:
+                return texts
+                
+            gutter = self.OCR_GUTTER
+            width = max(binary.shape[1] for _, binary in binaries)
+            height = gutter + sum(binary.shape[0] + gutter for _, binary in binaries)
+            composite = np.full((height, width), 255, dtype=np.uint8)
+            
+            # (y inicial, y final, índice de la región) de cada franja
+            rows = []
+            y = gutter
+            for i, binary in binaries:
+                h, w = binary.shape
+                composite[y:y+h, :w] = binary
+                rows.append((y, y + h, i))
+                y += h + gutter
+                
+            data = pytesseract.image_to_data(
+                composite,
+                config=self.tesseract_config,
+                output_type=pytesseract.Output.DICT
+            )
+            
+            # Agrupar palabras por región y línea conservando el orden de lectura
+            lines = [{} for _ in rois]
+            for word, block, par, line_num, top, word_height in zip(
+                data['text'], data['block_num'], data['par_num'],
+                data['line_num'], data['top'], data['height']
+            ):
+                if not word.strip():
+                    continue
+                center = top + word_height / 2
+                for row_start, row_end, i in rows:
+                    if row_start <= center < row_end:
+                        lines[i].setdefault((block, par, line_num), []).append(word)
+                        break
+                        
+            return ['\n'.join(' '.join(words) for words in region.values()) for region in lines]
+            
+        except Exception as e:
+            self.logger.error(f"Error en OCR: {str(e)}")
+            return texts
+
+    def _process_lines(self, roi: np.ndarray) -> List[Tuple[str, int, int]]:
+        """
+        Extrae las líneas de texto con su posición vertical en una sola
+        llamada a Tesseract.
+        
+        Args:
+            roi: Región de interés de la imagen, en escala de grises
+            
+        Returns:
+            List[Tuple[str, int, int]]: (texto, y inicial, y final) por línea, de arriba abajo
+        """
+        try:
+            binary = self._binarize_for_ocr(roi)
+            data = pytesseract.image_to_data(
+                binary,
+                config=self.tesseract_config,
+                output_type=pytesseract.Output.DICT
+            )
+            
+            # Agrupar palabras por línea: (bloque, párrafo, línea) -> [palabras, top, bottom]
+            lines = {}
+            for word, block, par, line_num, top, height in zip(
+                data['text'], data['block_num'], data['par_num'],
+                data['line_num'], data['top'], data['height']
+            ):
+                if not word.strip():
+                    continue
+                key = (block, par, line_num)
+                entry = lines.get(key)
+                if entry is None:
+                    lines[key] = [[word], top, top + height]
+                else:
+                    entry[0].append(word)
+                    entry[1] = min(entry[1], top)
+                    entry[2] = max(entry[2], top + height)
+                    
+            return sorted(
+                ((' '.join(words), top, bottom) for words, top, bottom in lines.values()),
+                key=lambda line: line[1]
+            )
+            
+        except Exception as e:
+            self.logger.error(f"Error en OCR: {str(e)}")
+            return []
\ No newline at end of file
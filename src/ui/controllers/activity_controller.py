@@ -1,12 +1,28 @@
-from typing import List, Optional, Dict, Tuple
+from typing import List, Optional, Dict, Tuple, AsyncIterator, Iterable
 from datetime import datetime, timedelta
 import logging
+import re
 from ..models.activity import Activity as UIActivity, SurveyTemplate
-from ...core.activity import Activity as DBActivity, ActivityStatus
+from ...core.activity import Activity as DBActivity, ActivityStatus, _REGEX_METACHARS
 from ..data_manager import UIDataManager
 
 logger = logging.getLogger(__name__)
 
+# Campos que usa _convert_to_ui_model. La plantilla va completa (con sus
+# preguntas) porque los modelos UI pueden volver a guardarse con update_activity
+_LISTING_PROJECTION = {
+    "name": 1,
+    "description": 1,
+    "survey_template": 1,
+    "start_date": 1,
+    "end_date": 1,
+    "location": 1,
+    "participant_ids": 1,
+    "status": 1
+}
+
+_PARTICIPANT_OPERATORS = {"add": "$addToSet", "remove": "$pull"}
+
 class ActivityController:
     def __init__(self, data_manager: UIDataManager):
         self.data_manager = data_manager
@@ -15,18 +31,19 @@ class ActivityController:
         """Convierte un modelo de base de datos a modelo UI"""
         try:
             # Crear SurveyTemplate
+            template = db_activity.get('survey_template') or {}
             survey_template = SurveyTemplate(
-                name=db_activity.get('survey_template', {}).get('name', ''),
-                questions=db_activity.get('survey_template', {}).get('questions', []),
-                type=db_activity.get('survey_template', {}).get('type', 'baseline')
+                name=template.get('name', ''),
+                questions=template.get('questions', []),
+                type=template.get('type', 'baseline')
             )
             
-            # Crear Activity UI
+            # Crear Activity UI; la fecha actual solo se calcula si falta start_date
             return UIActivity(
                 name=db_activity.get('name', ''),
                 description=db_activity.get('description', ''),
                 survey_template=survey_template,
-                start_date=db_activity.get('start_date', datetime.now()),
+                start_date=db_activity['start_date'] if 'start_date' in db_activity else datetime.now(),
                 end_date=db_activity.get('end_date'),
                 location=db_activity.get('location', ''),
                 participant_ids=db_activity.get('participant_ids', [])
@@ -75,10 +92,25 @@ class ActivityController:
             logger.error(f"Error al obtener actividad: {e}")
             raise
 
-    async def update_activity(self, activity_id: str, activity: UIActivity) -> bool:
-        """Actualiza una actividad existente"""
+    async def update_activity(self, activity_id: str, activity: UIActivity,
+                              changed_fields: Optional[Iterable[str]] = None) -> bool:
+        """
+        Actualiza una actividad existente
+        
+        Args:
+            activity_id: ID de la actividad
+            activity: Actividad con los valores nuevos
+            changed_fields: Campos modificados; si se indican solo esos
+                            (y updated_at) se envían a la base de datos
+        """
         try:
             db_activity = self._convert_to_db_model(activity)
+            if changed_fields is not None:
+                db_activity = {
+                    key: db_activity[key]
+                    for key in (*changed_fields, "updated_at")
+                    if key in db_activity
+                }
             success = await self.data_manager.update_activity(activity_id, db_activity)
             logger.info(f"Actividad {activity_id} actualizada: {success}")
             return success
@@ -101,6 +133,20 @@ class ActivityController:
         """
         Busca actividades con filtros avanzados
         
+        Args:
+            query: Texto de búsqueda
+            filters: Diccionario con filtros adicionales (ver iter_search_activities)
+        """
+        return [activity async for activity in self.iter_search_activities(query, filters)]
+
+    async def iter_search_activities(self, query: str = "", 
+                                   filters: Dict = None) -> AsyncIterator[UIActivity]:
+        """
+        Busca actividades con filtros avanzados.
+        
+        Las actividades se entregan a medida que llegan del cursor
+        (``async for``), sin cargar todo el resultado en memoria.
+        
         Args:
             query: Texto de búsqueda
             filters: Diccionario con filtros adicionales como:
@@ -111,14 +157,22 @@ class ActivityController:
         try:
             # Construir query completa
             db_query = {}
+            projection = _LISTING_PROJECTION
+            sort = None
             
-            # Búsqueda por texto
-            if query:
+            # Búsqueda por texto: usa el índice de texto ordenando por relevancia;
+            # si la consulta tiene metacaracteres de regex conserva la búsqueda por regex
+            if query and _REGEX_METACHARS.search(query):
+                pattern = re.compile(query, re.IGNORECASE)
                 db_query["$or"] = [
-                    {"name": {"$regex": query, "$options": "i"}},
-                    {"description": {"$regex": query, "$options": "i"}},
-                    {"location": {"$regex": query, "$options": "i"}}
+                    {"name": pattern},
+                    {"description": pattern},
+                    {"location": pattern}
                 ]
+            elif query:
+                db_query["$text"] = {"$search": query}
+                projection = {**_LISTING_PROJECTION, "score": {"$meta": "textScore"}}
+                sort = [("score", {"$meta": "textScore"})]
             
             # Aplicar filtros adicionales
             if filters:
@@ -132,11 +186,11 @@ class ActivityController:
                 if "location" in filters:
                     db_query["location"] = filters["location"]
 
-            # Obtener resultados
-            db_activities = await self.data_manager.find_many("activities", db_query)
-            
-            # Convertir a modelos UI
-            return [self._convert_to_ui_model(act) for act in db_activities]
+            # Obtener resultados y convertirlos a modelos UI por lotes
+            async for act in self.data_manager.iter_many(
+                "activities", db_query, projection=projection, sort=sort
+            ):
+                yield self._convert_to_ui_model(act)
             
         except Exception as e:
             logger.error(f"Error en búsqueda de actividades: {e}")
@@ -145,13 +199,14 @@ class ActivityController:
     async def get_activity_statistics(self, activity_id: str) -> Dict:
         """Obtiene estadísticas de una actividad"""
         try:
-            participants = await self.data_manager.get_activity_participants(activity_id)
-            survey_results = await self.data_manager.get_survey_results(activity_id)
+            counts = await self.data_manager.get_activity_counts(activity_id)
+            total_participants = counts["participants"]
+            total_surveys = counts["surveys"]
             
             return {
-                "total_participants": len(participants),
-                "total_surveys": len(survey_results),
-                "completion_rate": len(survey_results) / len(participants) * 100 if participants else 0,
+                "total_participants": total_participants,
+                "total_surveys": total_surveys,
+                "completion_rate": total_surveys / total_participants * 100 if total_participants else 0,
                 "last_update": datetime.now()
             }
         except Exception as e:
@@ -171,7 +226,8 @@ class ActivityController:
                         "$gte": start_date,
                         "$lte": end_date
                     }
-                }
+                },
+                projection=_LISTING_PROJECTION
             )
             
             return [self._convert_to_ui_model(act) for act in db_activities]
@@ -184,7 +240,8 @@ class ActivityController:
         try:
             db_activities = await self.data_manager.find_many(
                 "activities",
-                {"location": {"$regex": location, "$options": "i"}}
+                {"location": {"$regex": location, "$options": "i"}},
+                projection=_LISTING_PROJECTION
             )
             return [self._convert_to_ui_model(act) for act in db_activities]
         except Exception as e:
@@ -203,24 +260,16 @@ class ActivityController:
             action: "add" o "remove"
         """
         try:
-            activity = await self.data_manager.get_activity(activity_id)
-            if not activity:
-                raise ValueError(f"Actividad no encontrada: {activity_id}")
-
-            current_participants = set(activity.get('participant_ids', []))
-            
-            if action == "add":
-                current_participants.update(participant_ids)
-            elif action == "remove":
-                current_participants.difference_update(participant_ids)
-            else:
+            operator = _PARTICIPANT_OPERATORS.get(action)
+            if operator is None:
                 raise ValueError(f"Acción no válida: {action}")
 
-            # Actualizar actividad
-            success = await self.data_manager.update_activity(
-                activity_id,
-                {"participant_ids": list(current_participants)}
+            # Un solo update atómico en el servidor en lugar de leer y reescribir la lista
+            success = await self.data_manager.modify_array(
+                "activities", activity_id, operator, "participant_ids", participant_ids
             )
+            if not success:
+                raise ValueError(f"Actividad no encontrada: {activity_id}")
             
             logger.info(
                 f"Participantes {action}ed en actividad {activity_id}: {success}"
@@ -1,10 +1,16 @@
 # src/ui/data_manager.py
 
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, AsyncIterator
 import logging
 import asyncio
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import islice
 from datetime import datetime
 from bson import ObjectId
+from pymongo import DESCENDING
 from ..database.db_manager import DatabaseManager
 from ..core.activity import Activity
 from ..core.participant import Participant
@@ -13,58 +19,130 @@ from .models.survey_result import SurveyResult
 # Configurar el logger
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=1024)
+def _object_id(value: str) -> ObjectId:
+    """
+    Convierte un ID en texto a ObjectId.
+    
+    Los mismos IDs se repiten durante una sesión; ObjectId es inmutable,
+    así que la instancia validada se puede reutilizar.
+    
+    Raises:
+        bson.errors.InvalidId: Si el texto no es un ObjectId válido
+    """
+    return ObjectId(value)
+
+# Expresión de agregación equivalente a SurveyResult.is_complete: un resultado
+# está completo si ninguna respuesta está vacía o solo contiene espacios
+_IS_COMPLETE_EXPR = {
+    "$eq": [
+        {"$size": {"$filter": {
+            "input": {"$objectToArray": {"$ifNull": ["$responses", {}]}},
+            "as": "answer",
+            "cond": {"$regexMatch": {"input": "$$answer.v", "regex": r"^\s*$"}}
+        }}},
+        0
+    ]
+}
+
 class UIDataManager:
+    # Las vistas piden la misma actividad varias veces seguidas; se guarda
+    # durante unos segundos y se invalida al actualizarla o eliminarla
+    ACTIVITY_CACHE_TTL = 30.0
+    ACTIVITY_CACHE_SIZE = 1024
+    # Máximo de hilos para operaciones de base de datos
+    MAX_DB_WORKERS = 32
+    
     def __init__(self, db_manager=None):
         self.db_manager = db_manager if db_manager else DatabaseManager()
+        # Pool de hilos propio para las llamadas bloqueantes a MongoDB, sin
+        # competir con el executor por defecto; no supera el pool de conexiones
+        max_workers = min(self.MAX_DB_WORKERS,
+                          getattr(self.db_manager, 'max_pool_size', self.MAX_DB_WORKERS))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="db")
+        # activity_id -> (instante de lectura, documento)
+        self._activity_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # Aumenta en cada invalidación; una lectura que se cruzó con una
+        # escritura no guarda su resultado (podría ser anterior a ella)
+        self._activity_cache_version = 0
 
+    def close(self) -> None:
+        """Detiene el pool de hilos y cierra la conexión con la base de datos."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.db_manager.close()
+        
+    async def _run_db(self, func, *args, **kwargs):
+        """Ejecuta una operación bloqueante de base de datos en el pool de hilos."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
         
-    def _serialize_for_mongo(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert data types to MongoDB compatible format"""
-        serialized = {}
-        for key, value in data.items():
-            if isinstance(value, datetime):
-                serialized[key] = value
-            elif isinstance(value, dict):
-                serialized[key] = self._serialize_for_mongo(value)
-            elif isinstance(value, list):
-                serialized[key] = [self._serialize_for_mongo(item) if isinstance(item, dict) else item for item in value]
-            else:
-                serialized[key] = value
-        return serialized
-
     async def get_all_activities(self) -> List[Dict]:
         """Obtiene todas las actividades de la base de datos."""
         try:
-            activities = await asyncio.to_thread(
+            # El índice de created_at entrega los documentos ya ordenados
+            return await self._run_db(
                 self.db_manager.find_many,
                 "activities",
-                {}
+                {},
+                sort=[("created_at", DESCENDING)]
             )
-            return sorted(activities, key=lambda x: x.get('created_at', ''), reverse=True)
         except Exception as e:
             logger.error(f"Error al obtener actividades: {e}")
             return []
 
             
-    async def get_activity_participants(self, activity_id: str) -> List[Dict]:
-        """Obtiene los participantes de una actividad específica."""
+    async def get_activity_participants(self, activity_id: str,
+                                        fields: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Obtiene los participantes de una actividad específica.
+        
+        Args:
+            activity_id: ID de la actividad
+            fields: Campos a devolver (opcional); por defecto el documento completo
+        """
+        projection = dict.fromkeys(fields, 1) if fields else None
         try:
-            return await asyncio.to_thread(
+            return await self._run_db(
                 self.db_manager.find_many,
                 "participants",
-                {"activities": activity_id}
+                {"activities": activity_id},
+                projection
             )
         except Exception as e:
             logger.error(f"Error al obtener participantes: {e}")
             return []
 
+    async def get_activity_counts(self, activity_id: str) -> Dict[str, int]:
+        """
+        Cuenta en el servidor los participantes y resultados de encuesta de
+        una actividad, sin traer los documentos.
+        """
+        try:
+            participants, surveys = await asyncio.gather(
+                self._run_db(
+                    self.db_manager.count_documents,
+                    "participants",
+                    {"activities": activity_id}
+                ),
+                self._run_db(
+                    self.db_manager.count_documents,
+                    "survey_results",
+                    {"activity_id": activity_id}
+                )
+            )
+            return {"participants": participants, "surveys": surveys}
+        except Exception as e:
+            logger.error(f"Error al contar documentos de la actividad: {e}")
+            return {"participants": 0, "surveys": 0}
+
             
     async def add_participant(self, participant_data: Dict, activity_id: str) -> Optional[str]:
         """Añade un nuevo participante y lo asocia a una actividad."""
         try:
             participant = Participant(**participant_data)
             participant.join_activity(activity_id)
-            return await asyncio.to_thread(
+            return await self._run_db(
                 self.db_manager.insert_one,
                 "participants", 
                 participant.to_dict()
@@ -76,75 +154,187 @@ class UIDataManager:
     async def insert_activity(self, activity_data: Dict[str, Any]) -> Optional[str]:
         """Inserta una nueva actividad en la base de datos."""
         try:
-            serialized_data = self._serialize_for_mongo(activity_data)
-            return await asyncio.to_thread(
+            # DatabaseManager serializa el documento; la copia superficial
+            # evita que las marcas de tiempo se añadan al diccionario del llamador
+            return await self._run_db(
                 self.db_manager.insert_one,
                 "activities",
-                serialized_data
+                dict(activity_data)
             )
         except Exception as e:
             logger.error(f"Error al insertar actividad: {e}")
             return None
 
+    def _invalidate_activity(self, activity_id: str) -> None:
+        """Descarta la actividad cacheada tras una escritura."""
+        self._activity_cache_version += 1
+        self._activity_cache.pop(activity_id, None)
+
     async def get_activity(self, activity_id: str) -> Optional[Dict[str, Any]]:
-        """Obtiene una actividad por su ID."""
+        """
+        Obtiene una actividad por su ID.
+        
+        Las lecturas repetidas dentro de ACTIVITY_CACHE_TTL segundos se
+        sirven desde memoria; se devuelve una copia profunda para que el
+        llamador pueda modificarla (incluidos los objetos anidados) sin
+        alterar la caché.
+        """
+        now = time.monotonic()
+        cached = self._activity_cache.get(activity_id)
+        if cached is not None and now - cached[0] < self.ACTIVITY_CACHE_TTL:
+            return copy.deepcopy(cached[1])
+            
+        version = self._activity_cache_version
         try:
-            return await asyncio.to_thread(
+            activity = await self._run_db(
                 self.db_manager.find_one,
                 "activities",
-                {"_id": ObjectId(activity_id)}
+                {"_id": _object_id(activity_id)}
             )
         except Exception as e:
             logger.error(f"Error al obtener actividad: {e}")
             return None
+            
+        if activity is None:
+            return None
+            
+        if version != self._activity_cache_version:
+            return activity
+            
+        # Se reinserta al final para que la entrada más antigua quede primero
+        self._activity_cache.pop(activity_id, None)
+        if len(self._activity_cache) >= self.ACTIVITY_CACHE_SIZE:
+            del self._activity_cache[next(iter(self._activity_cache))]
+        self._activity_cache[activity_id] = (now, activity)
+        return copy.deepcopy(activity)
 
     async def update_activity(self, activity_id: str, activity_data: Dict[str, Any]) -> bool:
         """Actualiza una actividad existente."""
         try:
-            serialized_data = self._serialize_for_mongo(activity_data)
-            result = await asyncio.to_thread(
+            result = await self._run_db(
                 self.db_manager.update_one,
                 "activities",
-                {"_id": ObjectId(activity_id)},
-                {"$set": serialized_data}
+                {"_id": _object_id(activity_id)},
+                {"$set": dict(activity_data)}
             )
             return bool(result)
         except Exception as e:
             logger.error(f"Error al actualizar actividad: {e}")
             return False
+        finally:
+            self._invalidate_activity(activity_id)
+
+    async def modify_array(self, collection: str, document_id: str,
+                           operator: str, field: str, values: List[Any]) -> bool:
+        """
+        Agrega o quita valores de un campo lista con una sola operación atómica.
+        
+        Args:
+            collection: Nombre de la colección
+            document_id: ID del documento
+            operator: "$addToSet" para agregar o "$pull" para quitar
+            field: Campo lista a modificar
+            values: Valores a agregar o quitar
+            
+        Returns:
+            bool: True si se modificó el documento
+        """
+        if operator == "$addToSet":
+            change = {"$each": list(values)}
+        elif operator == "$pull":
+            change = {"$in": list(values)}
+        else:
+            raise ValueError(f"Operador no válido: {operator}")
+            
+        try:
+            result = await self._run_db(
+                self.db_manager.update_one,
+                collection,
+                {"_id": _object_id(document_id)},
+                {operator: {field: change}}
+            )
+            return bool(result)
+        except Exception as e:
+            logger.error(f"Error al modificar {field} en {collection}: {e}")
+            return False
+        finally:
+            if collection == "activities":
+                self._invalidate_activity(document_id)
 
     async def delete_activity(self, activity_id: str) -> bool:
         """Elimina una actividad por su ID y limpia las referencias."""
         try:
-            # Primero, obtener todos los participantes de la actividad
-            participants = self.get_activity_participants(activity_id)
+            object_id = _object_id(activity_id)
             
-            # Eliminar la referencia a la actividad de cada participante
-            for participant in participants:
-                participant_id = str(participant["_id"])
-                await asyncio.to_thread(
-                    self.db_manager.update_one,
+            # Quitar la referencia de todos sus participantes con una sola
+            # actualización y eliminar la actividad al mismo tiempo
+            _, result = await asyncio.gather(
+                self._run_db(
+                    self.db_manager.update_many,
                     "participants",
-                    {"_id": ObjectId(participant_id)},
+                    {"activities": activity_id},
                     {"$pull": {"activities": activity_id}}
+                ),
+                self._run_db(
+                    self.db_manager.delete_one,
+                    "activities",
+                    {"_id": object_id}
                 )
-            
-            # Luego eliminar la actividad
-            result = await asyncio.to_thread(
-                self.db_manager.delete_one,
-                "activities",
-                {"_id": ObjectId(activity_id)}
             )
             
             return bool(result)
         except Exception as e:
             logger.error(f"Error al eliminar actividad: {e}")
             return False
+        finally:
+            self._invalidate_activity(activity_id)
+
+    async def find_many(self, collection: str, query: Dict,
+                        projection: Optional[Dict] = None,
+                        sort: Optional[List] = None) -> List[Dict[str, Any]]:
+        """Busca documentos en una colección sin bloquear el event loop."""
+        try:
+            return await self._run_db(
+                self.db_manager.find_many,
+                collection,
+                query,
+                projection,
+                sort
+            )
+        except Exception as e:
+            logger.error(f"Error al buscar en {collection}: {e}")
+            return []
+
+    async def iter_many(self, collection: str, query: Dict,
+                        projection: Optional[Dict] = None,
+                        sort: Optional[List] = None,
+                        batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Recorre los documentos de una búsqueda por lotes, sin materializar
+        todo el resultado; cada lote se lee en el pool de hilos.
+        """
+        cursor = await self._run_db(
+            self.db_manager.find_cursor,
+            collection,
+            query,
+            projection,
+            sort,
+            batch_size
+        )
+        try:
+            while True:
+                batch = await self._run_db(list, islice(cursor, batch_size))
+                if not batch:
+                    break
+                for document in batch:
+                    yield document
+        finally:
+            cursor.close()
 
     async def get_activities_by_location(self, location: str) -> List[Dict[str, Any]]:
         """Obtiene actividades por ubicación."""
         try:
-            return await asyncio.to_thread(
+            return await self._run_db(
                 self.db_manager.find_many,
                 "activities",
                 {"location": location}
@@ -168,17 +358,28 @@ class UIDataManager:
                 raise ValueError(f"Actividad no encontrada: {result.activity_id}")
 
             # Validar que el participante existe y está en la actividad
-            participants = self.get_activity_participants(result.activity_id)
-            participant_ids = [str(p.get("_id")) for p in participants]
-            
-            if result.participant_id not in participant_ids:
+            # con una consulta puntual en lugar de traer todos los participantes
+            try:
+                participant_query = {
+                    "_id": _object_id(result.participant_id),
+                    "activities": result.activity_id
+                }
+            except Exception as e:
+                raise ValueError(f"ID de participante inválido: {str(e)}")
+                
+            participant = await self._run_db(
+                self.db_manager.find_one,
+                "participants",
+                participant_query,
+                {"_id": 1}
+            )
+            if not participant:
                 raise ValueError(f"Participante no encontrado en la actividad: {result.participant_id}")
 
-            # Convertir a diccionario y serializar
+            # Convertir a diccionario; DatabaseManager lo serializa al insertar
             result_dict = result.to_dict()
-            result_dict = self._serialize_for_mongo(result_dict)
             
-            inserted_id = await asyncio.to_thread(
+            inserted_id = await self._run_db(
                 self.db_manager.insert_one,
                 "survey_results",
                 result_dict
@@ -196,58 +397,47 @@ class UIDataManager:
             logger.error(f"Error al guardar resultado de encuesta: {str(e)}")
             return None
 
-    async def get_survey_results(
-        self,
-        activity_id: str,
-        start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
-    ) -> List[Dict]:
+    async def save_survey_results(self, activity_id: str,
+                                  results: List[SurveyResult]) -> List[str]:
+        """
+        Guarda varios resultados de encuesta de una misma actividad
+        con una sola inserción en la base de datos.
+        
+        Los resultados de participantes que no pertenecen a la actividad
+        se descartan y se registran en el log.
+        """
         try:
-            # Crear la consulta base
-            query = {"activity_id": activity_id}
-            
-            # Ajustar el formato de las fechas si existen
-            if start_date or end_date:
-                date_query = {}
-                if start_date:
-                    # Asegurar que la fecha está en UTC
-                    date_query["$gte"] = start_date.replace(microsecond=0)
-                    logger.info(f"Start date query: {date_query['$gte']}")
-                if end_date:
-                    date_query["$lte"] = end_date.replace(microsecond=0)
-                    logger.info(f"End date query: {date_query['$lte']}")
-                    
-                query["processed_at"] = date_query
-
-            logger.info(f"Query final: {query}")
+            activity = await self.get_activity(activity_id)
+            if not activity:
+                raise ValueError(f"Actividad no encontrada: {activity_id}")
+                
+            participants = await self.get_activity_participants(activity_id, fields=["_id"])
+            participant_ids = {str(p.get("_id")) for p in participants}
             
-            # Obtener resultados
-            results = await asyncio.to_thread(
-                self.db_manager.find_many,
+            documents = []
+            for result in results:
+                if result.participant_id not in participant_ids:
+                    logger.warning(f"Participante no encontrado en la actividad: {result.participant_id}")
+                    continue
+                documents.append(result.to_dict())
+                
+            if not documents:
+                return []
+                
+            return await self._run_db(
+                self.db_manager.insert_many,
                 "survey_results",
-                query
+                documents,
+                assume_new=True
             )
             
-            logger.info(f"Resultados encontrados: {len(results)}")
-            for r in results:
-                logger.info(f"Fecha encontrada: {r.get('processed_at')}")
-            
-            # Convertir resultados
-            processed_results = []
-            for r in results:
-                try:
-                    processed = SurveyResult.from_dict(r).to_dict()
-                    processed_results.append(processed)
-                except Exception as e:
-                    logger.error(f"Error procesando resultado: {e}", exc_info=True)
-                    continue
-                    
-            return processed_results
-                
+        except ValueError as ve:
+            logger.error(f"Error de validación: {str(ve)}")
+            raise
         except Exception as e:
-            logger.error(f"Error al obtener resultados de encuestas: {e}")
+            logger.error(f"Error al guardar resultados de encuesta: {str(e)}")
             return []
-    
+
     async def get_survey_result(self, result_id: str) -> Optional[Dict]:
         """
         Obtiene un resultado específico por su ID.
@@ -259,10 +449,10 @@ class UIDataManager:
             Dict: Resultado de la encuesta o None si no se encuentra
         """
         try:
-            result = await asyncio.to_thread(
+            result = await self._run_db(
                 self.db_manager.find_one,
                 "survey_results",
-                {"_id": ObjectId(result_id)}
+                {"_id": _object_id(result_id)}
             )
             
             return SurveyResult.from_dict(result).to_dict() if result else None
@@ -275,7 +465,9 @@ class UIDataManager:
         self,
         activity_id: str,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        projection: Optional[Dict] = None
     ) -> List[Dict]:
         """
         Obtiene los resultados de encuestas para una actividad específica.
@@ -284,6 +476,8 @@ class UIDataManager:
             activity_id: ID de la actividad
             start_date: Fecha inicial para filtrar resultados (opcional)
             end_date: Fecha final para filtrar resultados (opcional)
+            limit: Número máximo de resultados a devolver (opcional)
+            projection: Campos a devolver (opcional)
             
         Returns:
             List[Dict]: Lista de resultados de encuestas
@@ -300,10 +494,12 @@ class UIDataManager:
                     
                 query["processed_at"] = date_query
 
-            results = await asyncio.to_thread(
+            results = await self._run_db(
                 self.db_manager.find_many,
                 "survey_results",
-                query
+                query,
+                projection,
+                limit=limit
             )
             
             processed_results = []
@@ -344,13 +540,19 @@ class UIDataManager:
             except Exception as e:
                 raise ValueError(f"Datos de actualización inválidos: {str(e)}")
             
-            # Serializar y actualizar
-            result_dict = self._serialize_for_mongo(result.to_dict())
-            updated = await asyncio.to_thread(
+            # Enviar solo los campos que cambiaron respecto al documento actual
+            changes = {
+                key: value for key, value in result.to_dict().items()
+                if current_result.get(key) != value
+            }
+            if not changes:
+                return True
+                
+            updated = await self._run_db(
                 self.db_manager.update_one,
                 "survey_results",
-                {"_id": ObjectId(result_id)},
-                {"$set": result_dict}
+                {"_id": _object_id(result_id)},
+                {"$set": changes}
             )
             
             if not updated:
@@ -376,10 +578,10 @@ class UIDataManager:
             bool: True si la eliminación fue exitosa
         """
         try:
-            return await asyncio.to_thread(
+            return await self._run_db(
                 self.db_manager.delete_one,
                 "survey_results",
-                {"_id": ObjectId(result_id)}
+                {"_id": _object_id(result_id)}
             )
         except Exception as e:
             logger.error(f"Error al eliminar resultado de encuesta: {e}")
@@ -390,28 +592,32 @@ class UIDataManager:
         Obtiene estadísticas agregadas de los resultados de una actividad.
         """
         try:
-            results = await self.get_survey_results(activity_id)
-            if not results:
+            # Un único $group en el servidor; solo viaja una fila de totales
+            stats = await self._run_db(
+                self.db_manager.aggregate,
+                "survey_results",
+                [
+                    {"$match": {"activity_id": activity_id}},
+                    {"$group": {
+                        "_id": None,
+                        "total": {"$sum": 1},
+                        "avg_confidence": {"$avg": "$confidence"},
+                        "complete": {"$sum": {"$cond": [_IS_COMPLETE_EXPR, 1, 0]}}
+                    }}
+                ]
+            )
+            total_results = stats[0]["total"] if stats else 0
+            if not total_results:
                 return {
                     "total_results": 0,
                     "avg_confidence": 0.0,
                     "completion_rate": 0.0
                 }
 
-            # Convertir resultados a instancias de SurveyResult
-            survey_results = [SurveyResult.from_dict(r) for r in results]
-            
-            # Calcular estadísticas
-            total_results = len(survey_results)
-            avg_confidence = sum(r.confidence for r in survey_results) / total_results
-            completion_rate = sum(
-                1 for r in survey_results if r.is_complete()
-            ) / total_results * 100
-
             return {
                 "total_results": total_results,
-                "avg_confidence": round(avg_confidence, 2),
-                "completion_rate": round(completion_rate, 2)
+                "avg_confidence": round(stats[0]["avg_confidence"] or 0.0, 2),
+                "completion_rate": round(stats[0]["complete"] / total_results * 100, 2)
             }
                 
         except Exception as e:
@@ -425,7 +631,7 @@ class UIDataManager:
     async def get_all_participants(self) -> List[Dict]:
         """Obtiene todos los participantes de la base de datos."""
         try:
-            return await asyncio.to_thread(
+            return await self._run_db(
                 self.db_manager.find_many,
                 "participants",
                 {}
@@ -437,10 +643,10 @@ class UIDataManager:
     async def get_participant(self, participant_id: str) -> Optional[Dict]:
         """Obtiene un participante por su ID."""
         try:
-            participant = await asyncio.to_thread(
+            participant = await self._run_db(
                 self.db_manager.find_one,
                 "participants",
-                {"_id": ObjectId(participant_id)}
+                {"_id": _object_id(participant_id)}
             )
             return participant
         except Exception as e:
@@ -450,7 +656,7 @@ class UIDataManager:
     async def get_participants_by_community(self, community: str) -> List[Dict]:
         """Obtiene los participantes de una comunidad específica."""
         try:
-            return await asyncio.to_thread(
+            return await self._run_db(
                 self.db_manager.find_many,
                 "participants",
                 {"community": community}
@@ -465,7 +671,7 @@ class UIDataManager:
         Este método es más flexible que get_survey_results y permite filtros más complejos.
         """
         try:
-            results = await asyncio.to_thread(
+            results = await self._run_db(
                 self.db_manager.find_many,
                 "survey_results",
                 query
@@ -5,6 +5,11 @@ from PyQt6.QtCore import Qt
 from ..models.activity import Activity, SurveyTemplate, SurveyType
 from datetime import datetime
 
+# Tipos de encuesta en el orden del combo; se calculan una vez al importar
+_SURVEY_TYPES = tuple(SurveyType)
+_SURVEY_TYPE_VALUES = [survey_type.value for survey_type in _SURVEY_TYPES]
+_SURVEY_TYPE_INDEX = {value: index for index, value in enumerate(_SURVEY_TYPE_VALUES)}
+
 class ActivityDialog(QDialog):
     def __init__(self, parent=None, activity=None):
         super().__init__(parent)
@@ -27,8 +32,7 @@ class ActivityDialog(QDialog):
         
         # Selector de tipo de encuesta
         self.survey_type_combo = QComboBox()
-        for survey_type in SurveyType:
-            self.survey_type_combo.addItem(survey_type.value)
+        self.survey_type_combo.addItems(_SURVEY_TYPE_VALUES)
 
         # Añadir campos al formulario
         form_layout.addRow("Nombre:", self.name_edit)
@@ -61,8 +65,8 @@ class ActivityDialog(QDialog):
             self.start_date_edit.setDate(self.activity.start_date)
             if self.activity.end_date:
                 self.end_date_edit.setDate(self.activity.end_date)
-            index = self.survey_type_combo.findText(self.activity.survey_template.type.value)
-            if index >= 0:
+            index = _SURVEY_TYPE_INDEX.get(self.activity.survey_template.type.value)
+            if index is not None:
                 self.survey_type_combo.setCurrentIndex(index)
 
     def get_activity_data(self) -> Activity:
@@ -72,7 +76,7 @@ class ActivityDialog(QDialog):
             survey_template=SurveyTemplate(
                 name=f"Survey_{self.name_edit.text()}",
                 questions=[],  # Se llenarán después
-                type=SurveyType(self.survey_type_combo.currentText()),
+                type=_SURVEY_TYPES[self.survey_type_combo.currentIndex()],
             ),
             start_date=self.start_date_edit.date().toPyDate(),
             end_date=self.end_date_edit.date().toPyDate(),
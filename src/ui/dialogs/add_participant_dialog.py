@@ -3,10 +3,10 @@
 from PyQt6.QtWidgets import (
     QDialog, QFormLayout, QLineEdit, QComboBox,
     QPushButton, QSpinBox, QVBoxLayout, QMessageBox,
-    QHBoxLayout, QLabel, QDateEdit, QWidget
+    QHBoxLayout, QLabel, QDateEdit, QWidget, QApplication
 )
-from PyQt6.QtCore import pyqtSignal, Qt, QDate
-from datetime import datetime
+from PyQt6.QtCore import pyqtSignal, Qt, QDate, QStringListModel
+from typing import Dict, List, Optional
 
 class AddParticipantDialog(QDialog):
     participantAdded = pyqtSignal(dict)
@@ -35,29 +35,86 @@ class AddParticipantDialog(QDialog):
         "Más de $20,000"
     ]
     
+    # Las listas conservan el orden de la interfaz; los conjuntos son para validar
+    _EDUCATION_LEVELS_SET = frozenset(EDUCATION_LEVELS)
+    _GENDER_OPTIONS_SET = frozenset(GENDER_OPTIONS)
+    _INCOME_LEVELS_SET = frozenset(INCOME_LEVELS)
+    
+    # Hoja de estilo única del diálogo; los widgets se seleccionan por objectName
+    # para que Qt la analice una sola vez en lugar de una por widget
+    STYLE_SHEET = """
+        QLabel#title {
+            font-size: 18px;
+            font-weight: bold;
+            color: #2C3E50;
+            padding: 10px 0;
+        }
+        QLabel#requiredNote {
+            color: #E74C3C;
+        }
+        QLabel#formLabel {
+            font-weight: bold;
+            color: #2C3E50;
+        }
+        QLineEdit#requiredField {
+            padding: 8px;
+            border: 1px solid #bdc3c7;
+            border-radius: 4px;
+        }
+        QLineEdit#requiredField:focus {
+            border: 1px solid #3498db;
+        }
+        QPushButton#cancel, QPushButton#save {
+            padding: 8px 16px;
+            color: white;
+            border: none;
+            border-radius: 4px;
+        }
+        QPushButton#cancel {
+            background-color: #95a5a6;
+        }
+        QPushButton#cancel:hover {
+            background-color: #7f8c8d;
+        }
+        QPushButton#save {
+            background-color: #2ecc71;
+        }
+        QPushButton#save:hover {
+            background-color: #27ae60;
+        }
+    """
+    
+    # Modelos de opciones compartidos por todas las instancias; se crean al
+    # abrir el primer diálogo porque necesitan una QApplication activa
+    _choice_models: Dict[str, QStringListModel] = {}
+    
+    @classmethod
+    def _choice_model(cls, name: str, items: List[str]) -> QStringListModel:
+        """Devuelve el modelo compartido de una lista de opciones fija"""
+        model = cls._choice_models.get(name)
+        if model is None:
+            model = QStringListModel(items, QApplication.instance())
+            cls._choice_models[name] = model
+        return model
+    
     def __init__(self, parent=None, participant_data=None):
         super().__init__(parent)
         self.participant_data = participant_data
-        self.setWindowTitle("Añadir Participante" if not participant_data else "Editar Participante")
+        self._title = "Añadir Participante" if not participant_data else "Editar Participante"
+        self.setWindowTitle(self._title)
         self.setup_ui()
         
         if participant_data:
             self.load_participant_data()
             
     def setup_ui(self):
+        self.setStyleSheet(self.STYLE_SHEET)
         layout = QVBoxLayout(self)
         layout.setSpacing(15)
         
         # Título
-        title = QLabel(self.windowTitle())
-        title.setStyleSheet("""
-            QLabel {
-                font-size: 18px;
-                font-weight: bold;
-                color: #2C3E50;
-                padding: 10px 0;
-            }
-        """)
+        title = QLabel(self._title)
+        title.setObjectName("title")
         layout.addWidget(title)
         
         # Formulario principal
@@ -67,7 +124,7 @@ class AddParticipantDialog(QDialog):
         
         # Campos obligatorios
         required_label = QLabel("* Campos obligatorios")
-        required_label.setStyleSheet("color: #E74C3C;")
+        required_label.setObjectName("requiredNote")
         layout.addWidget(required_label)
         
         # Nombre
@@ -91,17 +148,17 @@ class AddParticipantDialog(QDialog):
         
         # Nivel educativo
         self.education_level = QComboBox()
-        self.education_level.addItems(self.EDUCATION_LEVELS)
+        self.education_level.setModel(self._choice_model("education", self.EDUCATION_LEVELS))
         form_layout.addRow(self.create_label("Nivel Educativo:"), self.education_level)
         
         # Género
         self.gender = QComboBox()
-        self.gender.addItems(self.GENDER_OPTIONS)
+        self.gender.setModel(self._choice_model("gender", self.GENDER_OPTIONS))
         form_layout.addRow(self.create_label("Género:"), self.gender)
         
         # Nivel de ingresos
         self.income_level = QComboBox()
-        self.income_level.addItems(self.INCOME_LEVELS)
+        self.income_level.setModel(self._choice_model("income", self.INCOME_LEVELS))
         form_layout.addRow(self.create_label("Nivel de Ingresos:"), self.income_level)
         
         # Dependientes
@@ -117,33 +174,9 @@ class AddParticipantDialog(QDialog):
         buttons_layout.addStretch()
         
         self.cancel_button = QPushButton("Cancelar")
+        self.cancel_button.setObjectName("cancel")
         self.save_button = QPushButton("Guardar")
-        
-        self.cancel_button.setStyleSheet("""
-            QPushButton {
-                padding: 8px 16px;
-                background-color: #95a5a6;
-                color: white;
-                border: none;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #7f8c8d;
-            }
-        """)
-        
-        self.save_button.setStyleSheet("""
-            QPushButton {
-                padding: 8px 16px;
-                background-color: #2ecc71;
-                color: white;
-                border: none;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #27ae60;
-            }
-        """)
+        self.save_button.setObjectName("save")
         
         buttons_layout.addWidget(self.cancel_button)
         buttons_layout.addWidget(self.save_button)
@@ -160,27 +193,13 @@ class AddParticipantDialog(QDialog):
     def create_label(self, text: str) -> QLabel:
         """Crea una etiqueta con estilo consistente"""
         label = QLabel(text)
-        label.setStyleSheet("""
-            QLabel {
-                font-weight: bold;
-                color: #2C3E50;
-            }
-        """)
+        label.setObjectName("formLabel")
         return label
         
     def setup_required_field(self, widget, placeholder: str):
         """Configura un campo requerido con estilo y placeholder"""
         widget.setPlaceholderText(placeholder)
-        widget.setStyleSheet("""
-            QLineEdit {
-                padding: 8px;
-                border: 1px solid #bdc3c7;
-                border-radius: 4px;
-            }
-            QLineEdit:focus {
-                border: 1px solid #3498db;
-            }
-        """)
+        widget.setObjectName("requiredField")
         
     def load_participant_data(self):
         """Carga los datos del participante para edición"""
@@ -189,56 +208,62 @@ class AddParticipantDialog(QDialog):
             
         self.name_input.setText(self.participant_data.get('name', ''))
         
-        # Convertir fecha de string a QDate
+        # Convertir fecha de string a QDate; "d/M" acepta días y meses con o sin cero
         birth_date_str = self.participant_data.get('birth_date', '')
         if birth_date_str:
-            try:
-                date = datetime.strptime(birth_date_str, '%d/%m/%Y')
-                self.birth_date_input.setDate(QDate(date.year, date.month, date.day))
-            except ValueError:
-                pass
+            birth_date = QDate.fromString(birth_date_str, "d/M/yyyy")
+            if birth_date.isValid():
+                self.birth_date_input.setDate(birth_date)
         
         # Cargar resto de campos
         self.community_input.setCurrentText(self.participant_data.get('community', ''))
         
         education = self.participant_data.get('education_level', '')
-        if education in self.EDUCATION_LEVELS:
+        if education in self._EDUCATION_LEVELS_SET:
             self.education_level.setCurrentText(education)
             
         gender = self.participant_data.get('gender', '')
-        if gender in self.GENDER_OPTIONS:
+        if gender in self._GENDER_OPTIONS_SET:
             self.gender.setCurrentText(gender)
             
         income = self.participant_data.get('income_level', '')
-        if income in self.INCOME_LEVELS:
+        if income in self._INCOME_LEVELS_SET:
             self.income_level.setCurrentText(income)
             
         self.dependents.setValue(self.participant_data.get('dependents', 0))
         
-    def validate_inputs(self) -> bool:
-        """Valida los campos requeridos"""
-        if not self.name_input.text().strip():
+    def validate_inputs(self) -> Optional[Dict[str, str]]:
+        """
+        Valida los campos requeridos.
+        
+        Returns:
+            Dict con el nombre y la comunidad ya recortados, o None si falta alguno
+        """
+        name = self.name_input.text().strip()
+        if not name:
             QMessageBox.warning(self, "Campo requerido", "Por favor ingrese el nombre del participante")
             self.name_input.setFocus()
-            return False
+            return None
             
-        if not self.community_input.currentText().strip():
+        community = self.community_input.currentText().strip()
+        if not community:
             QMessageBox.warning(self, "Campo requerido", "Por favor seleccione o ingrese una comunidad")
             self.community_input.setFocus()
-            return False
+            return None
             
-        return True
+        return {'name': name, 'community': community}
         
     def save_participant(self):
         """Guarda los datos del participante"""
-        if not self.validate_inputs():
+        required = self.validate_inputs()
+        if required is None:
             return
             
         # Crear diccionario con datos del participante
         participant_data = {
-            'name': self.name_input.text().strip(),
+            'name': required['name'],
             'birth_date': self.birth_date_input.date().toString("dd/MM/yyyy"),
-            'community': self.community_input.currentText().strip(),
+            'community': required['community'],
             'education_level': self.education_level.currentText(),
             'gender': self.gender.currentText(),
             'income_level': self.income_level.currentText(),
@@ -2,15 +2,64 @@
 
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, 
                            QLabel, QProgressBar, QMessageBox, QFileDialog)
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QThread
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from ..data_manager import UIDataManager
-from ...utils.survey_generator import SurveyGenerator
-from typing import List, Dict
+from ...utils.survey_generator import render_survey
+from typing import List, Dict, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+class SurveyGenerationThread(QThread):
+    """Genera los PDF en procesos worker sin bloquear la interfaz."""
+    progress = pyqtSignal(int)
+    completed = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, tasks: List[Tuple[str, str, str, Dict, str]], output_dir: str, parent=None):
+        super().__init__(parent)
+        self.tasks = tasks
+        self.output_dir = output_dir
+        self._cancelled = False
+
+    def cancel(self):
+        """Pide detener la generación; los PDF pendientes no se inician."""
+        self._cancelled = True
+
+    def run(self):
+        try:
+            # Cada PDF es independiente; se reparten entre los núcleos disponibles
+            total = len(self.tasks)
+            workers = max(1, min(total, os.cpu_count() or 1))
+            # Solo se emite cuando cambia el porcentaje entero: como mucho
+            # 100 repintados de la barra, sin importar el tamaño del lote
+            last_percent = 0
+            # "spawn": hacer fork de un proceso Qt con varios hilos puede bloquearse
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            try:
+                futures = [executor.submit(render_survey, task) for task in self.tasks]
+                for done, future in enumerate(as_completed(futures), 1):
+                    if self._cancelled:
+                        return
+                    future.result()
+                    percent = done * 100 // total
+                    if percent != last_percent:
+                        last_percent = percent
+                        self.progress.emit(done)
+            finally:
+                executor.shutdown(cancel_futures=True)
+                
+            self.completed.emit(self.output_dir)
+            
+        except Exception as e:
+            self.error.emit(str(e))
+
 class GenerateSurveyDialog(QDialog):
     surveys_generated = pyqtSignal(str)  # Señal emitida cuando se generan las encuestas
 
@@ -18,7 +67,7 @@ class GenerateSurveyDialog(QDialog):
         super().__init__(parent)
         self.activity_data = activity_data
         self.participants = participants
-        self.survey_generator = SurveyGenerator()
+        self.generation_thread = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -69,36 +118,60 @@ class GenerateSurveyDialog(QDialog):
             self.generate_button.setEnabled(False)
             self.progress_bar.setValue(0)
 
-            # Generar encuestas
+            survey_name = self.activity_data.get('name', '')
+            tasks = []
             for i, participant in enumerate(self.participants):
-                output_path = os.path.join(
-                    output_dir,
-                    f"survey_{participant.get('id', str(i))}.pdf"
-                )
-
-                self.survey_generator.generate_survey_pdf(
-                    participant_id=participant.get('id', ''),
-                    survey_name=self.activity_data.get('name', ''),
-                    participant_name=participant.get('name', ''),
-                    activity_data=self.activity_data,
-                    output_path=output_path
-                )
-
-                self.progress_bar.setValue(i + 1)
-
-            QMessageBox.information(
-                self,
-                "Éxito",
-                f"Se generaron {len(self.participants)} encuestas en:\n{output_dir}"
-            )
-            self.surveys_generated.emit(output_dir)
-            self.accept()
+                participant_id = participant.get('id', '')
+                tasks.append((
+                    participant_id,
+                    survey_name,
+                    participant.get('name', ''),
+                    self.activity_data,
+                    # Sin ID se numera el archivo por posición
+                    os.path.join(output_dir, f"survey_{participant_id or i}.pdf")
+                ))
+
+            # Generar encuestas en segundo plano; el progreso llega por señales
+            self.generation_thread = SurveyGenerationThread(tasks, output_dir, self)
+            self.generation_thread.progress.connect(self.progress_bar.setValue)
+            self.generation_thread.completed.connect(self.on_generation_completed)
+            self.generation_thread.error.connect(self.on_generation_error)
+            self.generation_thread.start()
 
         except Exception as e:
-            logger.error(f"Error al generar encuestas: {e}")
-            QMessageBox.critical(
-                self,
-                "Error",
-                f"Error al generar encuestas: {str(e)}"
-            )
-            self.generate_button.setEnabled(True)
\ No newline at end of file
+            self.on_generation_error(str(e))
+
+    def on_generation_completed(self, output_dir: str):
+        """Notifica el fin de la generación de encuestas"""
+        QMessageBox.information(
+            self,
+            "Éxito",
+            f"Se generaron {len(self.participants)} encuestas en:\n{output_dir}"
+        )
+        self.surveys_generated.emit(output_dir)
+        self.accept()
+
+    def on_generation_error(self, message: str):
+        """Muestra el error de generación y permite reintentar"""
+        logger.error(f"Error al generar encuestas: {message}")
+        QMessageBox.critical(
+            self,
+            "Error",
+            f"Error al generar encuestas: {message}"
+        )
+        self.generate_button.setEnabled(True)
+
+    def reject(self):
+        """
+        Cancela la generación en curso; el diálogo se cierra cuando el hilo
+        termina, sin bloquear la interfaz mientras acaban los PDF en curso.
+        """
+        thread = self.generation_thread
+        if thread is not None and thread.isRunning():
+            thread.cancel()
+            self.cancel_button.setEnabled(False)
+            thread.finished.connect(lambda: QDialog.reject(self))
+            # El hilo pudo terminar antes de conectar la señal
+            if thread.isRunning():
+                return
+        super().reject()
@@ -8,8 +8,6 @@ from PyQt6.QtGui import QPixmap, QImage
 import os
 import logging
 from typing import List, Dict
-from ...ocr.batch_processor import BatchProcessor
-from ...ocr.preprocessor import Preprocessor
 from ..views.image_management_view import ImageManagementView
 
 logger = logging.getLogger(__name__)
@@ -22,8 +20,6 @@ class ProcessSurveysDialog(QDialog):
         self.activity_id = activity_id
         self.image_paths = []
         self.ocr_results = []
-        self.batch_processor = BatchProcessor()
-        self.preprocessor = Preprocessor()
         self.setup_ui()
 
     def setup_ui(self):
@@ -50,7 +46,7 @@ class ProcessSurveysDialog(QDialog):
         self.ocr_results = list(results.values())
         self.save_btn.setEnabled(True)
 
-    async def save_results(self):
+    def save_results(self):
         """Guarda los resultados del OCR"""
         try:
             self.surveys_processed.emit(self.ocr_results)
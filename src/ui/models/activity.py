@@ -30,7 +30,7 @@ class SurveyTemplate:
             name=data["name"],
             questions=data["questions"],
             type=SurveyType(data["type"]),
-            created_at=data.get("created_at", datetime.now())
+            created_at=data["created_at"] if "created_at" in data else datetime.now()
         )
 
 @dataclass
@@ -66,5 +66,5 @@ class Activity:
             end_date=data.get("end_date"),
             location=data["location"],
             participant_ids=data.get("participant_ids", []),
-            created_at=data.get("created_at", datetime.now())
+            created_at=data["created_at"] if "created_at" in data else datetime.now()
         )
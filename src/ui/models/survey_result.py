@@ -25,6 +25,7 @@ class SurveyResult:
             "processed_at": self.processed_at.replace(microsecond=0),  # Normalizar la fecha
             "notes": self.notes
         }
+
     @classmethod
     def from_dict(cls, data: Dict) -> 'SurveyResult':
         """Crea una instancia desde un diccionario."""
@@ -206,11 +206,13 @@ class ActivityView(QWidget):
 
         try:
             # Obtener datos necesarios
-            activity = await self.data_manager.get_activity(self.current_activity_id)
+            activity, participants = await asyncio.gather(
+                self.data_manager.get_activity(self.current_activity_id),
+                self.data_manager.get_activity_participants(self.current_activity_id)
+            )
             if not activity:
                 raise Exception("No se pudo obtener la información de la actividad")
 
-            participants = await self.data_manager.get_activity_participants(self.current_activity_id)
             if not participants:
                 QMessageBox.warning(
                     self,
@@ -506,8 +508,10 @@ class ActivityView(QWidget):
                 self.current_activity_id = activity_id
                 
                 # Cargar detalles y actualizar UI
-                activity_data = await self.data_manager.get_activity(activity_id)
-                participants = await self.data_manager.get_activity_participants(activity_id)
+                activity_data, participants = await asyncio.gather(
+                    self.data_manager.get_activity(activity_id),
+                    self.data_manager.get_activity_participants(activity_id)
+                )
                 
                 if activity_data:
                     self.activity_info.setText(
@@ -528,7 +532,10 @@ class ActivityView(QWidget):
     async def load_activity_details(self, activity_id: str):
         """Carga los detalles de una actividad"""
         try:
-            activity_data = await self.data_manager.get_activity(activity_id)
+            activity_data, participants = await asyncio.gather(
+                self.data_manager.get_activity(activity_id),
+                self.data_manager.get_activity_participants(activity_id)
+            )
             if not activity_data:
                 raise Exception("No se encontró la actividad")
 
@@ -541,7 +548,6 @@ class ActivityView(QWidget):
             )
 
             # Cargar participantes
-            participants = await self.data_manager.get_activity_participants(activity_id)
             self.update_participants_table(participants)
         except Exception as e:
             logger.error(f"Error al cargar detalles de actividad: {e}")
@@ -709,8 +715,10 @@ class ActivityView(QWidget):
                 activity_id = str(activities[selected_idx].get("_id", ""))
                 self.current_activity_id = activity_id
                 
-                activity_data = await self.data_manager.get_activity(activity_id)
-                participants = await self.data_manager.get_activity_participants(activity_id)
+                activity_data, participants = await asyncio.gather(
+                    self.data_manager.get_activity(activity_id),
+                    self.data_manager.get_activity_participants(activity_id)
+                )
                 
                 if activity_data:
                     self.activity_info.setText(
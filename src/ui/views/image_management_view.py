@@ -7,16 +7,28 @@ from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QImage, QPixmap
 import cv2
 import numpy as np
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional
 
 from ..controllers.activity_controller import ActivityController
+from ..models.survey_result import SurveyResult
 from ...ocr.batch_processor import BatchProcessor
 from ...ocr.preprocessor import ImagePreprocessor
 from ...utils.logger import setup_logger
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=1)
+def _get_batch_processor() -> BatchProcessor:
+    """Procesador OCR compartido; se crea al abrir la primera vista."""
+    return BatchProcessor()
+
+@lru_cache(maxsize=1)
+def _get_image_preprocessor() -> ImagePreprocessor:
+    """Preprocesador compartido; se crea al abrir la primera vista."""
+    return ImagePreprocessor()
+
 class ImageProcessingThread(QThread):
     progress = pyqtSignal(int)
     result_ready = pyqtSignal(str, dict)  # Nueva señal
@@ -61,8 +73,8 @@ class ImageManagementView(QWidget):
     
     def __init__(self, data_manager=None, parent=None):
         super().__init__(parent)
-        self.batch_processor = BatchProcessor()
-        self.image_preprocessor = ImagePreprocessor()
+        self.batch_processor = _get_batch_processor()
+        self.image_preprocessor = _get_image_preprocessor()
         self.data_manager = data_manager
         self.image_paths: List[Path] = []
         self.current_image_index = 0
@@ -199,13 +211,18 @@ class ImageManagementView(QWidget):
             
             # Guardar resultados en la base de datos
             if self.data_manager:
-                for path, result in results.items():
-                    if 'error' not in result:
-                        await self.data_manager.save_survey_result(
-                            activity_id=activity_id,
-                            participant_id=result['participant_id'],
-                            responses=result['responses']
-                        )
+                survey_results = [
+                    SurveyResult(
+                        participant_id=result['participant_id'],
+                        activity_id=activity_id,
+                        responses=result['responses'],
+                        confidence=result.get('confidence', 0.0)
+                    )
+                    for result in results.values()
+                    if 'error' not in result
+                ]
+                if survey_results:
+                    await self.data_manager.save_survey_results(activity_id, survey_results)
             
             self.processing_complete.emit(results)
             QMessageBox.information(self, "Éxito", "Procesamiento completado")
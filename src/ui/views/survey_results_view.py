@@ -222,8 +222,10 @@ class SurveyResultsView(QWidget):
                       "Pregunta", "Respuesta", "Confianza", "Fecha", "Notas"]
             
             for result in self.current_results:
-                participant = await self.data_manager.get_participant(result['participant_id'])
-                activity = await self.data_manager.get_activity(result['activity_id'])
+                participant, activity = await asyncio.gather(
+                    self.data_manager.get_participant(result['participant_id']),
+                    self.data_manager.get_activity(result['activity_id'])
+                )
                 
                 for question, answer in result['responses'].items():
                     row = {
@@ -8,7 +8,7 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 import qrcode
 from io import BytesIO
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import os
 from datetime import datetime
 
@@ -47,8 +47,8 @@ class SurveyGenerator:
         
         # Generar y añadir código QR
         qr_data = f"{participant_id}_{datetime.now().strftime('%Y%m%d')}"
-        qr_path = self._generate_qr(qr_data)
-        c.drawImage(qr_path, self.width - 100, self.height - 100, 80, 80)
+        qr_image = self._generate_qr(qr_data)
+        c.drawImage(qr_image, self.width - 100, self.height - 100, 80, 80)
         
         # Encabezado
         self._draw_header(c, participant_id, survey_name, participant_name)
@@ -71,16 +71,22 @@ class SurveyGenerator:
         c.save()
         return output_path
         
-    def _generate_qr(self, data: str) -> str:
-        """Genera un código QR y lo guarda temporalmente"""
+    def _generate_qr(self, data: str) -> ImageReader:
+        """
+        Genera un código QR en memoria.
+        
+        No usa un archivo temporal para que varios procesos puedan
+        generar encuestas a la vez sin pisarse el PNG.
+        """
         qr = qrcode.QRCode(version=1, box_size=10, border=5)
         qr.add_data(data)
         qr.make(fit=True)
         
         img = qr.make_image(fill_color="black", back_color="white")
-        temp_path = "temp_qr.png"
-        img.save(temp_path)
-        return temp_path
+        buffer = BytesIO()
+        img.save(buffer)
+        buffer.seek(0)
+        return ImageReader(buffer)
         
     def _draw_header(self, c: canvas.Canvas, participant_id: str, survey_name: str, participant_name: str):
         """Dibuja el encabezado del formulario"""
@@ -174,4 +180,32 @@ class SurveyGenerator:
                     c.drawString(self.margin + 20, self.current_y, f"□ {option}")
                     self.current_y -= self.line_height
             
-            self.current_y -= self.line_height/2
\ No newline at end of file
+            self.current_y -= self.line_height/2
+
+
+# Generador de cada proceso worker; se crea al primer uso
+_worker_generator: Optional[SurveyGenerator] = None
+
+def render_survey(task: Tuple[str, str, str, Dict, str]) -> str:
+    """
+    Genera el PDF de una encuesta a partir de la tupla
+    (participant_id, survey_name, participant_name, activity_data, output_path).
+    
+    Es una función de módulo para poder enviarla a un ProcessPoolExecutor;
+    dentro de un worker reutiliza un único SurveyGenerator por proceso.
+    
+    Returns:
+        str: Ruta del archivo PDF generado
+    """
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = SurveyGenerator()
+        
+    participant_id, survey_name, participant_name, activity_data, output_path = task
+    return _worker_generator.generate_survey_pdf(
+        participant_id=participant_id,
+        survey_name=survey_name,
+        participant_name=participant_name,
+        activity_data=activity_data,
+        output_path=output_path
+    )
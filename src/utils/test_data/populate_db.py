@@ -37,14 +37,9 @@ def populate_database():
                 logger.error(f"Error al limpiar colección {collection}: {e}")
         
         # Insertar nuevos datos
-        for activity in data["activities"]:
-            db_manager.insert_one("activities", activity)
-        
-        for participant in data["participants"]:
-            db_manager.insert_one("participants", participant)
-        
-        for result in data["survey_results"]:
-            db_manager.insert_one("survey_results", result)
+        db_manager.insert_many("activities", data["activities"])
+        db_manager.insert_many("participants", data["participants"])
+        db_manager.insert_many("survey_results", data["survey_results"])
         
         logger.info(f"""
         Datos insertados exitosamente:
@@ -69,7 +64,7 @@ def populate_database():
         logger.error(f"Error al poblar la base de datos: {e}")
         raise
     finally:
-        del db_manager
+        db_manager.close()
 
 if __name__ == "__main__":
     populate_database()
\ No newline at end of file
@@ -130,7 +130,7 @@ def db_manager(test_environment) -> Generator[DatabaseManager, None, None]:
         except Exception as e:
             logging.warning(f"Error al limpiar colección {collection}: {str(e)}")
     
-    manager.client.close()
+    manager.close()
 
 @pytest.fixture(scope="function")
 def test_collection_name() -> str:
@@ -1,6 +1,8 @@
+import re
 import pytest
 from datetime import datetime, timezone
-from src.core.activity import Activity, ActivityStatus
+from unittest.mock import MagicMock
+from src.core.activity import Activity, ActivityManager, ActivityStatus
 
 @pytest.fixture
 def valid_activity():
@@ -150,6 +152,16 @@ def test_to_dict(valid_activity):
     assert isinstance(activity_dict["updated_at"], str)
     assert isinstance(activity_dict["change_log"], list)
 
+def test_to_dict_shallow(valid_activity):
+    valid_activity.add_participant("user123", "coord123")
+    
+    shallow = valid_activity.to_dict(shallow=True)
+    assert shallow["participants"] is valid_activity.participants
+    assert shallow["admins"] is valid_activity.admins
+    
+    # Por defecto se devuelven copias serializables
+    assert valid_activity.to_dict()["participants"] == ["user123"]
+
 def test_change_log(valid_activity):
     # Test initial log entry
     assert len(valid_activity.change_log) == 1
@@ -158,4 +170,121 @@ def test_change_log(valid_activity):
     # Test log after actions
     valid_activity.add_participant("user123", "coord123")
     assert len(valid_activity.change_log) == 2
-    assert "added_participant" in valid_activity.change_log[1]["action"]
\ No newline at end of file
+    assert "added_participant" in valid_activity.change_log[1]["action"]
+
+def test_change_log_timestamps_serialized(valid_activity):
+    valid_activity.add_participant("user123", "coord123")
+    
+    # En memoria se guarda el datetime; to_dict lo convierte a ISO
+    assert isinstance(valid_activity.change_log[1]["timestamp"], datetime)
+    serialized = valid_activity.to_dict()["change_log"]
+    assert serialized[1]["timestamp"] == valid_activity.change_log[1]["timestamp"].isoformat()
+    
+    # Las entradas cargadas como texto se conservan
+    valid_activity.change_log[0]["timestamp"] = "2024-01-01T00:00:00+00:00"
+    assert valid_activity.to_dict()["change_log"][0]["timestamp"] == "2024-01-01T00:00:00+00:00"
+
+
+def test_batch_change_log(valid_activity):
+    updated_at = valid_activity.updated_at
+    
+    with valid_activity.batch():
+        valid_activity.add_participant("user1", "coord123")
+        valid_activity.add_participant("user2", "coord123")
+        # Las entradas quedan pendientes hasta cerrar el lote
+        assert len(valid_activity.change_log) == 1
+        assert valid_activity.updated_at == updated_at
+    
+    assert len(valid_activity.change_log) == 3
+    assert valid_activity.change_log[2]["action"] == "added_participant_user2"
+    assert valid_activity.updated_at >= updated_at
+    
+    # Un lote vacío no modifica el log
+    valid_activity.begin_batch()
+    assert valid_activity.end_batch() == 0
+    assert len(valid_activity.change_log) == 3
+
+def test_manager_add_participants_single_write(valid_activity):
+    db_manager = MagicMock()
+    manager = ActivityManager(db_manager)
+    
+    added = manager.add_participants(valid_activity, ["user1", "user2", "user1"], "coord123")
+    
+    assert added == ["user1", "user2"]
+    assert db_manager.update_one.call_count == 1
+    update = db_manager.update_one.call_args[0][2]["$set"]
+    assert set(update["participants"]) == {"user1", "user2"}
+    assert len(update["change_log"]) == 3
+
+def test_nested_batch_flushes_once(valid_activity):
+    with valid_activity.batch():
+        valid_activity.add_participant("user1", "coord123")
+        with valid_activity.batch():
+            valid_activity.add_participant("user2", "coord123")
+        # El lote interno no vuelca las entradas del externo
+        assert len(valid_activity.change_log) == 1
+        valid_activity.add_participant("user3", "coord123")
+        assert len(valid_activity.change_log) == 1
+    
+    assert len(valid_activity.change_log) == 4
+    
+    with pytest.raises(RuntimeError):
+        valid_activity.end_batch()
+
+@pytest.mark.parametrize("side_effect, return_value", [
+    (None, False),
+    (Exception("Test failure"), None),
+])
+def test_manager_add_participants_rolls_back_on_failure(valid_activity, side_effect, return_value):
+    db_manager = MagicMock()
+    db_manager.update_one.side_effect = side_effect
+    db_manager.update_one.return_value = return_value
+    manager = ActivityManager(db_manager)
+    updated_at = valid_activity.updated_at
+    
+    added = manager.add_participants(valid_activity, ["user1", "user2"], "coord123")
+    
+    assert added == []
+    assert valid_activity.participants == set()
+    assert len(valid_activity.change_log) == 1
+    assert valid_activity.updated_at == updated_at
+
+def test_to_dict_dates_follow_changes(valid_activity):
+    assert valid_activity.to_dict()["start_date"] == "01/01/2024"
+    
+    valid_activity.end_date = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    assert valid_activity.to_dict()["end_date"] == "01/03/2024"
+
+def test_manager_search_uses_text_index():
+    db_manager = MagicMock()
+    manager = ActivityManager(db_manager)
+    
+    manager.search_activities("agricultura")
+    args, kwargs = db_manager.find_many.call_args
+    assert args[1] == {"$text": {"$search": "agricultura"}}
+    assert kwargs["sort"] == [("score", {"$meta": "textScore"})]
+    assert kwargs["projection"]["score"] == {"$meta": "textScore"}
+    assert kwargs["projection"]["name"] == 1
+    
+    # Consultas con metacaracteres conservan la búsqueda por regex
+    manager.search_activities("agri.*")
+    args, kwargs = db_manager.find_many.call_args
+    assert "$or" in args[1]
+    assert "sort" not in kwargs
+    patterns = [clause[field] for clause in args[1]["$or"] for field in clause]
+    assert patterns[0].pattern == "agri.*"
+    assert patterns[0].flags & re.IGNORECASE
+    assert all(p is patterns[0] for p in patterns)
+
+def test_manager_list_projection():
+    db_manager = MagicMock()
+    manager = ActivityManager(db_manager)
+    
+    manager.list_participant_activities("user123")
+    assert db_manager.find_many.call_args.kwargs["projection"] == {
+        "change_log": 0, "participants": 0
+    }
+    
+    # El llamador puede pedir el documento completo
+    manager.list_participant_activities("user123", projection=None)
+    assert db_manager.find_many.call_args.kwargs["projection"] is None
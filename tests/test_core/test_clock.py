@@ -0,0 +1,37 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from src.core.clock import parse_ddmmyyyy, utcnow_cached
+
+def test_utcnow_cached_returns_utc():
+    now, iso = utcnow_cached()
+    assert isinstance(now, datetime)
+    assert now.tzinfo == timezone.utc
+    assert iso == now.isoformat()
+
+def test_utcnow_cached_reuses_same_millisecond():
+    with patch('src.core.clock.time.time_ns', return_value=1_700_000_000_123_456_789):
+        first = utcnow_cached()
+        second = utcnow_cached()
+    assert first[0] is second[0]
+    assert first[1] is second[1]
+    
+    # Un milisegundo distinto genera un nuevo timestamp
+    with patch('src.core.clock.time.time_ns', return_value=1_700_000_000_124_000_000):
+        third = utcnow_cached()
+    assert third[0] > first[0]
+
+def test_utcnow_cached_keeps_microseconds():
+    with patch('src.core.clock.time.time_ns', return_value=1_700_000_000_987_654_321):
+        now, iso = utcnow_cached()
+    assert now.microsecond == 987_654
+    assert iso.endswith('.987654+00:00')
+
+def test_parse_ddmmyyyy_matches_strptime():
+    for date_str in ["01/01/2024", "29/02/2024", "1/2/2024"]:
+        expected = datetime.strptime(date_str, '%d/%m/%Y').replace(tzinfo=timezone.utc)
+        assert parse_ddmmyyyy(date_str) == expected
+    
+    for invalid in ["31/02/2024", "2024/01/01", "aa/bb/cccc"]:
+        with pytest.raises(ValueError):
+            parse_ddmmyyyy(invalid)
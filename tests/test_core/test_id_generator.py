@@ -1,4 +1,6 @@
 import pytest
+import re
+import unicodedata
 from src.core.id_generator import ParticipantIDGenerator
 
 @pytest.fixture
@@ -22,6 +24,20 @@ def test_clean_name():
     
     # Test only special characters
     assert generator.clean_name("!@#$%^&*()") == ""
+    
+    # Test other Latin accents
+    assert generator.clean_name("Çécile Müller Ōtani") == "cecile muller otani"
+
+def test_clean_name_matches_nfkd_outside_latin1():
+    def nfkd_clean(name):
+        name = unicodedata.normalize('NFKD', name.lower())
+        name = name.encode('ASCII', 'ignore').decode('ASCII')
+        return ' '.join(re.sub(r'[^a-z\s]', '', name).split())
+    
+    names = ["Ștefan Țurcanu", "Nguyễn", "Ǎlvaro", "Ｊｕａｎ", "ﬁlomena", "José Ștefan"]
+    for name in names:
+        assert ParticipantIDGenerator.clean_name(name) == nfkd_clean(name)
+    assert ParticipantIDGenerator.clean_name("Ștefan Țurcanu") == "stefan turcanu"
 
 def test_validate_date():
     generator = ParticipantIDGenerator()
@@ -67,6 +83,18 @@ def test_generate_id():
     with pytest.raises(ValueError):
         generator.generate_id("Juan Pérez", "2000-01-01")
 
+def test_generate_id_blake2():
+    generator = ParticipantIDGenerator(use_blake2=True)
+    
+    # Test consistent ID generation with BLAKE2b
+    id1 = generator.generate_id("Juan Pérez", "01/01/1990")
+    id2 = generator.generate_id("JUAN PÉREZ", "01/01/1990")
+    assert id1 == id2
+    assert len(id1) == 8
+    
+    # Test default generator keeps SHA-256 IDs
+    assert ParticipantIDGenerator().generate_id("Juan Pérez", "01/01/1990") != id1
+
 def test_id_uniqueness():
     generator = ParticipantIDGenerator()
     
@@ -1,8 +1,9 @@
 import pytest
 from unittest.mock import MagicMock, patch
+from pymongo import UpdateOne
 from pymongo.errors import AutoReconnect, OperationFailure
 from bson.objectid import ObjectId
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 import asyncio
 from src.database.db_manager import DatabaseManager, ConnectionError, OperationError
 
@@ -27,7 +28,7 @@ class TestDatabaseManager:
         assert mock_collection.insert_one.call_count == 3
 
     def test_connection_retry_backoff(self, test_collection_name):
-        """Test del backoff exponencial en reintentos."""
+        """Test del backoff con jitter en reintentos."""
         sleep_times = []
 
         def mock_sleep(seconds):
@@ -40,15 +41,37 @@ class TestDatabaseManager:
         mock_db.__getitem__.return_value = mock_collection
         mock_client = MagicMock()
         mock_client.__getitem__.return_value = mock_db
+        # Sin servidor disponible se espera el tiempo completo
+        mock_client.topology_description.has_writable_server.return_value = False
 
         manager = DatabaseManager(client=mock_client, database="test_db")
 
-        with patch('time.sleep', side_effect=mock_sleep):
+        with patch('time.sleep', side_effect=mock_sleep), \
+                patch('random.uniform', side_effect=[1.5, 4.0]):
             with pytest.raises(ConnectionError):
                 manager.insert_one(test_collection_name, {"test": "data"})
 
-        expected_delays = [1, 2]
-        assert sleep_times == expected_delays
+        assert sum(sleep_times) == pytest.approx(5.5)
+        assert max(sleep_times) <= 0.05 + 1e-9
+        assert mock_collection.insert_one.call_count == 3
+
+    def test_connection_retry_short_circuit(self, test_collection_name):
+        """Test de reintento inmediato cuando el servidor ya está disponible."""
+        mock_collection = MagicMock()
+        mock_collection.insert_one.side_effect = AutoReconnect("Test disconnect")
+        mock_db = MagicMock()
+        mock_db.__getitem__.return_value = mock_collection
+        mock_client = MagicMock()
+        mock_client.__getitem__.return_value = mock_db
+        mock_client.topology_description.has_writable_server.return_value = True
+
+        manager = DatabaseManager(client=mock_client, database="test_db")
+
+        with patch('time.sleep') as mock_sleep:
+            with pytest.raises(ConnectionError):
+                manager.insert_one(test_collection_name, {"test": "data"})
+
+        mock_sleep.assert_not_called()
         assert mock_collection.insert_one.call_count == 3
 
     def test_retry_on_various_exceptions(self, test_collection_name):
@@ -130,4 +153,243 @@ class TestDatabaseManager:
         with pytest.raises(OperationError):
             manager.insert_one(test_collection_name, {"test": "data"})
 
-        assert mock_collection.insert_one.call_count == 1
\ No newline at end of file
+        assert mock_collection.insert_one.call_count == 1
+
+    def test_bulk_write_single_round_trip(self, test_collection_name):
+        """Test de escritura masiva en una sola petición."""
+        mock_collection = MagicMock()
+        mock_collection.bulk_write.return_value = MagicMock(
+            inserted_count=0, matched_count=1, modified_count=1,
+            upserted_count=1, deleted_count=0
+        )
+        mock_db = MagicMock()
+        mock_db.__getitem__.return_value = mock_collection
+        mock_client = MagicMock()
+        mock_client.__getitem__.return_value = mock_db
+
+        manager = DatabaseManager(client=mock_client, database="test_db")
+        operations = [
+            UpdateOne({"id": "ACT001"}, {"$set": {"status": "active"}}, upsert=True),
+            UpdateOne({"id": "ACT002"}, {"$set": {"status": "active"}}, upsert=True)
+        ]
+        result = manager.bulk_write(test_collection_name, operations)
+
+        assert mock_collection.bulk_write.call_count == 1
+        assert mock_collection.bulk_write.call_args.kwargs["ordered"] is False
+        assert result["upserted"] == 1
+        assert result["modified"] == 1
+        assert manager.bulk_write(test_collection_name, [])["inserted"] == 0
+        assert mock_collection.bulk_write.call_count == 1
+
+    def test_bulk_write_retry(self, test_collection_name):
+        """Test de reintentos en escritura masiva."""
+        mock_collection = MagicMock()
+        mock_collection.bulk_write.side_effect = AutoReconnect("Test disconnect")
+        mock_db = MagicMock()
+        mock_db.__getitem__.return_value = mock_collection
+        mock_client = MagicMock()
+        mock_client.__getitem__.return_value = mock_db
+
+        manager = DatabaseManager(client=mock_client, database="test_db")
+
+        with patch('time.sleep'):
+            with pytest.raises(ConnectionError):
+                manager.bulk_write(test_collection_name, [UpdateOne({"id": "x"}, {"$set": {"a": 1}})])
+
+        assert mock_collection.bulk_write.call_count == 3
+
+    def test_ensure_indexes_without_listing_collections(self):
+        """Test de creación de índices sin consultar las colecciones existentes."""
+        mock_collection = MagicMock()
+        mock_db = MagicMock()
+        mock_db.__getitem__.return_value = mock_collection
+        mock_client = MagicMock()
+        mock_client.__getitem__.return_value = mock_db
+
+        manager = DatabaseManager(client=mock_client, database="test_db")
+        manager._ensure_indexes()
+
+        mock_db.list_collection_names.assert_not_called()
+        assert mock_collection.create_indexes.call_count == 4
+
+    def test_notes_text_index_is_optional(self):
+        """Test del índice de texto de notas solo cuando se habilita."""
+        for enabled in (False, True):
+            mock_collection = MagicMock()
+            mock_db = MagicMock()
+            mock_db.__getitem__.return_value = mock_collection
+            mock_client = MagicMock()
+            mock_client.__getitem__.return_value = mock_db
+
+            manager = DatabaseManager(client=mock_client, database="test_db",
+                                      enable_notes_search=enabled)
+            manager._ensure_indexes()
+
+            names = [
+                model.document['name']
+                for call in mock_collection.create_indexes.call_args_list
+                for model in call.args[0]
+            ]
+            assert ('notes_text_idx' in names) is enabled
+
+    def test_ensure_indexes_error(self):
+        """Test de errores al crear índices."""
+        mock_collection = MagicMock()
+        mock_collection.create_indexes.side_effect = OperationFailure("Test failure")
+        mock_db = MagicMock()
+        mock_db.__getitem__.return_value = mock_collection
+        mock_client = MagicMock()
+        mock_client.__getitem__.return_value = mock_db
+
+        manager = DatabaseManager(client=mock_client, database="test_db")
+
+        with pytest.raises(OperationError):
+            manager._ensure_indexes()
+
+    def test_context_manager_closes_client(self):
+        """Test de cierre explícito de la conexión al salir del bloque with."""
+        mock_client = MagicMock()
+
+        with DatabaseManager(client=mock_client, database="test_db") as manager:
+            assert manager.client is mock_client
+            mock_client.close.assert_not_called()
+
+        mock_client.close.assert_called_once()
+
+    def test_connect_enables_wire_compression(self):
+        """Test de compresión del protocolo al crear el cliente."""
+        with patch('src.database.db_manager.MongoClient') as mock_mongo:
+            DatabaseManager()
+
+        kwargs = mock_mongo.call_args.kwargs
+        assert kwargs['compressors'] == 'zstd,snappy,zlib'
+        assert kwargs['zlibCompressionLevel'] == 6
+
+    def test_connect_pool_settings(self):
+        """Test de configuración del pool de conexiones."""
+        with patch('src.database.db_manager.MongoClient') as mock_mongo:
+            DatabaseManager(max_pool_size=100, min_pool_size=5)
+
+        kwargs = mock_mongo.call_args.kwargs
+        assert kwargs['maxPoolSize'] == 100
+        assert kwargs['minPoolSize'] == 5
+        assert kwargs['maxIdleTimeMS'] == 300000
+        assert kwargs['socketTimeoutMS'] == 30000
+
+    def test_find_many_batches_and_limits_cursor(self, test_collection_name):
+        """Test de lotes y límite del cursor en find_many."""
+        mock_cursor = MagicMock()
+        mock_cursor.batch_size.return_value = mock_cursor
+        mock_cursor.limit.return_value = mock_cursor
+        mock_cursor.hint.return_value = mock_cursor
+        mock_cursor.__iter__.return_value = iter([{"test": 1}])
+        mock_collection = MagicMock()
+        mock_collection.find.return_value = mock_cursor
+        mock_db = MagicMock()
+        mock_db.__getitem__.return_value = mock_collection
+        mock_client = MagicMock()
+        mock_client.__getitem__.return_value = mock_db
+
+        manager = DatabaseManager(client=mock_client, database="test_db")
+        result = manager.find_many(test_collection_name, {}, projection={"test": 1},
+                                   batch_size=500, limit=10)
+
+        assert result == [{"test": 1}]
+        mock_collection.find.assert_called_once_with({}, {"test": 1})
+        mock_cursor.batch_size.assert_called_once_with(500)
+        mock_cursor.limit.assert_called_once_with(10)
+        mock_cursor.hint.assert_not_called()
+
+        manager.find_many(test_collection_name, {}, hint="status_open_idx")
+        mock_cursor.hint.assert_called_once_with("status_open_idx")
+
+    def test_serialize_for_mongo_converts_dates(self):
+        """Test de serialización de fechas sin hora."""
+        manager = DatabaseManager(client=MagicMock(), database="test_db")
+        now = datetime.now(timezone.utc)
+
+        result = manager._serialize_for_mongo({
+            "text": "a",
+            "when": now,
+            "nested": {"day": date(2024, 1, 2)},
+            "items": [date(2024, 1, 3), 1]
+        })
+
+        assert result["text"] == "a"
+        assert result["when"] is now
+        assert result["nested"]["day"] == datetime(2024, 1, 2)
+        assert result["items"] == [datetime(2024, 1, 3), 1]
+
+    def test_insert_many_splits_batches(self, test_collection_name):
+        """Test de inserción masiva en lotes."""
+        mock_collection = MagicMock()
+        mock_collection.insert_many.side_effect = lambda docs, **kwargs: MagicMock(
+            inserted_ids=[ObjectId() for _ in docs]
+        )
+        mock_db = MagicMock()
+        mock_db.__getitem__.return_value = mock_collection
+        mock_client = MagicMock()
+        mock_client.__getitem__.return_value = mock_db
+
+        manager = DatabaseManager(client=mock_client, database="test_db")
+        ids = manager.insert_many(test_collection_name,
+                                  [{"n": i} for i in range(5)], batch_size=2)
+
+        assert len(ids) == 5
+        assert mock_collection.insert_many.call_count == 3
+
+    def test_update_many_sets_updated_at(self, test_collection_name):
+        """Test de actualización masiva en una sola operación."""
+        mock_collection = MagicMock()
+        mock_collection.update_many.return_value = MagicMock(modified_count=3)
+        mock_db = MagicMock()
+        mock_db.__getitem__.return_value = mock_collection
+        mock_client = MagicMock()
+        mock_client.__getitem__.return_value = mock_db
+
+        manager = DatabaseManager(client=mock_client, database="test_db")
+        modified = manager.update_many(test_collection_name, {"activities": "a1"},
+                                       {"$pull": {"activities": "a1"}})
+
+        assert modified == 3
+        query, update = mock_collection.update_many.call_args.args
+        assert query == {"activities": "a1"}
+        assert update["$pull"] == {"activities": "a1"}
+        assert isinstance(update["$set"]["updated_at"], datetime)
+
+    def test_aggregate(self, test_collection_name):
+        """Test de agregación ejecutada en el servidor."""
+        mock_collection = MagicMock()
+        mock_collection.aggregate.return_value = iter([{"_id": None, "total": 2}])
+        mock_db = MagicMock()
+        mock_db.__getitem__.return_value = mock_collection
+        mock_client = MagicMock()
+        mock_client.__getitem__.return_value = mock_db
+
+        manager = DatabaseManager(client=mock_client, database="test_db")
+        pipeline = [{"$group": {"_id": None, "total": {"$sum": 1}}}]
+
+        assert manager.aggregate(test_collection_name, pipeline) == [{"_id": None, "total": 2}]
+        mock_collection.aggregate.assert_called_once_with(pipeline)
+
+    def test_find_cursor_is_lazy(self, test_collection_name):
+        """Test de cursor sin materializar para recorrer resultados por lotes."""
+        mock_cursor = MagicMock()
+        mock_cursor.batch_size.return_value = mock_cursor
+        mock_cursor.sort.return_value = mock_cursor
+        mock_collection = MagicMock()
+        mock_collection.find.return_value = mock_cursor
+        mock_db = MagicMock()
+        mock_db.__getitem__.return_value = mock_collection
+        mock_client = MagicMock()
+        mock_client.__getitem__.return_value = mock_db
+
+        manager = DatabaseManager(client=mock_client, database="test_db")
+        cursor = manager.find_cursor(test_collection_name, {"a": 1}, sort=[("b", -1)],
+                                     batch_size=200)
+
+        assert cursor is mock_cursor
+        mock_collection.find.assert_called_once_with({"a": 1}, None)
+        mock_cursor.batch_size.assert_called_once_with(200)
+        mock_cursor.sort.assert_called_once_with([("b", -1)])
+        mock_cursor.__iter__.assert_not_called()
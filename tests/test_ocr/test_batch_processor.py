@@ -2,7 +2,7 @@ import pytest
 import cv2
 import numpy as np
 from pathlib import Path
-from src.ocr.batch_processor import SimpleBatchProcessor
+from src.ocr.batch_processor import SimpleBatchProcessor, _prefetch_files
 from src.ocr.preprocessor import ImagePreprocessor
 # Mantener los imports existentes y añadir:
 from src.ocr.batch_processor import BatchProcessor
@@ -68,6 +68,16 @@ def test_calculate_confidence(batch_processor):
         confidence = batch_processor._calculate_confidence(responses)
         assert abs(confidence - expected) < 0.01
 
+def test_detect_mark(batch_processor):
+    blank = np.full((40, 200), 255, dtype=np.uint8)
+    assert not batch_processor._detect_mark(blank)
+    
+    marked = blank.copy()
+    cv2.circle(marked, (100, 20), 10, 0, -1)
+    assert batch_processor._detect_mark(marked)
+    
+    assert not batch_processor._detect_mark(np.empty((0, 0), dtype=np.uint8))
+
 def test_error_handling(batch_processor, tmp_path):
     nonexistent = tmp_path / "nonexistent.png"
     with pytest.raises(FileNotFoundError):
@@ -123,6 +133,32 @@ def test_parallel_processing(sample_batch_dir, tmp_path):
     assert results['successful'] >= 0
     assert isinstance(results['processed_images'], list)
     
+def test_parallel_processing_repeated_runs(sample_batch_dir, tmp_path):
+    output_dir = tmp_path / "output"
+    processor = SimpleBatchProcessor(str(sample_batch_dir), str(output_dir), max_workers=2)
+    first = processor.process_directory(parallel=True)
+    second = processor.process_directory(parallel=True)
+    
+    assert first['successful'] == second['successful']
+    
+def test_prefetch_files(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"file_{i}.bin"
+        path.write_bytes(bytes([i]) * 10)
+        paths.append(path)
+    missing = tmp_path / "missing.bin"
+    
+    items = list(_prefetch_files(paths + [missing], depth=2))
+    assert [path for path, _ in items] == paths + [missing]
+    assert items[3][1] == bytes([3]) * 10
+    assert items[-1][1] is None
+    
+    # Interrumpir el consumo no deja el hilo lector bloqueado
+    prefetch = _prefetch_files(paths, depth=1)
+    next(prefetch)
+    prefetch.close()
+    
 def test_invalid_input_directory(tmp_path):
     nonexistent = tmp_path / "nonexistent"
     output_dir = tmp_path / "output"
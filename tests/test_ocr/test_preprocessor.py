@@ -2,7 +2,7 @@ import pytest
 import numpy as np
 import cv2
 from pathlib import Path
-from src.ocr.preprocessor import ImagePreprocessor
+from src.ocr.preprocessor import ImagePreprocessor, load_grayscale
 
 def test_assess_quality(sample_image):
     """Prueba la evaluación de calidad de imagen."""
@@ -59,6 +59,31 @@ def test_detect_and_correct_skew():
     corrected = preprocessor._correct_skew(rotated)
     assert corrected.shape == rotated.shape
 
+def test_detect_skew_on_large_image():
+    """Prueba que la detección sobre la copia reducida conserva el ángulo."""
+    image = np.ones((3000, 2400), dtype=np.uint8) * 255
+    for y in range(200, 2800, 60):
+        cv2.line(image, (200, y), (2200, y), 0, 3)
+    
+    rotation_matrix = cv2.getRotationMatrix2D((1200, 1500), -3, 1.0)
+    rotated = cv2.warpAffine(image, rotation_matrix, (2400, 3000), borderValue=255)
+    
+    angle = ImagePreprocessor()._detect_skew(rotated)
+    assert angle == pytest.approx(3, abs=0.25)
+
+def test_detect_skew_on_text():
+    """Prueba la detección de rotación sobre líneas de texto."""
+    image = np.ones((1600, 1200), dtype=np.uint8) * 255
+    for i, y in enumerate(range(80, 1550, 45)):
+        cv2.putText(image, f"Pregunta {i}: respuesta", (60, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, 0, 2)
+    
+    rotation_matrix = cv2.getRotationMatrix2D((600, 800), 12, 1.0)
+    rotated = cv2.warpAffine(image, rotation_matrix, (1200, 1600), borderValue=255)
+    
+    angle = ImagePreprocessor()._detect_skew(rotated)
+    assert angle == pytest.approx(-12, abs=0.5)
+
 def test_enhance_contrast(sample_image):
     """Prueba la mejora de contraste."""
     preprocessor = ImagePreprocessor()
@@ -71,6 +96,28 @@ def test_enhance_contrast(sample_image):
     assert isinstance(enhanced, np.ndarray)
     assert enhanced.shape == gray.shape
 
+def test_process_steps_skips_clahe_on_high_contrast(monkeypatch):
+    """Prueba que CLAHE solo se aplica cuando el contraste es bajo."""
+    preprocessor = ImagePreprocessor()
+    calls = []
+    original = preprocessor._enhance_contrast
+    monkeypatch.setattr(preprocessor, "_enhance_contrast",
+                        lambda image: calls.append(image.shape) or original(image))
+    
+    high_contrast = np.zeros((100, 100), dtype=np.uint8)
+    high_contrast[:, 50:] = 255
+    preprocessor._process_steps(high_contrast)
+    assert calls == []
+    
+    low_contrast = np.full((100, 100), 120, dtype=np.uint8)
+    low_contrast[:, 50:] = 140
+    preprocessor._process_steps(low_contrast)
+    assert calls == [(100, 100)]
+    
+    # El contraste medido previamente evita recalcularlo
+    preprocessor._process_steps(low_contrast, contrast=255.0)
+    assert calls == [(100, 100)]
+
 def test_adaptive_threshold(sample_image):
     """Prueba la binarización adaptativa."""
     preprocessor = ImagePreprocessor()
@@ -108,4 +155,22 @@ def test_with_different_image_types(tmp_path):
     assert gray_result is not None
     assert color_result is not None
     assert len(gray_result.shape) == 2
-    assert len(color_result.shape) == 2
\ No newline at end of file
+    assert len(color_result.shape) == 2
+
+
+def test_load_grayscale(tmp_path):
+    """Prueba la lectura directa en escala de grises."""
+    color_image = np.zeros((20, 30, 3), dtype=np.uint8)
+    color_path = tmp_path / "color.png"
+    cv2.imwrite(str(color_path), color_image)
+    
+    image = load_grayscale(color_path)
+    assert image.shape == (20, 30)
+    
+    empty_path = tmp_path / "empty.png"
+    empty_path.write_bytes(b"")
+    assert load_grayscale(empty_path) is None
+    
+    invalid_path = tmp_path / "invalid.png"
+    invalid_path.write_bytes(b"no es una imagen")
+    assert load_grayscale(invalid_path) is None
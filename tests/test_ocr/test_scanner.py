@@ -160,4 +160,80 @@ def test_different_image_formats(sample_scanner, tmp_path, sample_image):
     results_jpg = sample_scanner.scan_survey(str(jpg_path))
     
     assert isinstance(results_png["format_test"], str)
-    assert isinstance(results_jpg["format_test"], str)
\ No newline at end of file
+    assert isinstance(results_jpg["format_test"], str)
+
+
+def test_process_lines_groups_words(sample_scanner, sample_image, monkeypatch):
+    """Prueba la agrupación de palabras en líneas con su posición."""
+    data = {
+        'text': ['$', 'Pregunta', '', '1', '__'],
+        'block_num': [1, 1, 1, 1, 1],
+        'par_num': [1, 1, 1, 2, 2],
+        'line_num': [1, 1, 1, 1, 1],
+        'top': [10, 12, 0, 40, 42],
+        'height': [20, 18, 0, 15, 10]
+    }
+    monkeypatch.setattr("src.ocr.scanner.pytesseract.image_to_data",
+                        lambda *args, **kwargs: data)
+    
+    lines = sample_scanner._process_lines(sample_image)
+    assert lines == [("$ Pregunta", 10, 30), ("1 __", 40, 55)]
+
+def test_scan_survey_batches_text_fields(sample_scanner, sample_image, monkeypatch):
+    """Prueba que los campos de texto se leen con una sola llamada a Tesseract."""
+    data = {
+        'text': ['Hola', 'mundo', '', 'N', '12'],
+        'block_num': [1, 1, 1, 1, 1],
+        'par_num': [1, 1, 1, 2, 2],
+        'line_num': [1, 1, 1, 1, 1],
+        'top': [25, 26, 0, 100, 101],
+        'height': [20, 18, 0, 20, 18]
+    }
+    calls = []
+    def fake_image_to_data(image, **kwargs):
+        calls.append(image.shape)
+        return data
+    monkeypatch.setattr("src.ocr.scanner.pytesseract.image_to_data", fake_image_to_data)
+    
+    sample_scanner.register_field(SurveyField("nombre", (0, 0, 100, 50), "text"))
+    sample_scanner.register_field(SurveyField("edad", (0, 50, 100, 50), "number"))
+    
+    results = sample_scanner.scan_survey(sample_image)
+    assert results == {"nombre": "Hola mundo", "edad": "12"}
+    assert calls == [(160, 100)]
+
+def test_align_with_template(tmp_path):
+    """Prueba que la alineación acerca una imagen rotada al template."""
+    template = np.ones((800, 600), dtype=np.uint8) * 255
+    for i in range(40):
+        cv2.putText(template, f"Pregunta {i} ABC", ((i * 37) % 400, 20 + i * 19),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, 0, 2)
+    template_path = tmp_path / "template.png"
+    cv2.imwrite(str(template_path), template)
+    
+    scanner = SurveyScanner(str(template_path))
+    rotation_matrix = cv2.getRotationMatrix2D((300, 400), 3, 1.0)
+    rotated = cv2.warpAffine(template, rotation_matrix, (600, 800), borderValue=255)
+    
+    aligned = scanner._align_with_template(rotated)
+    assert aligned.shape == template.shape
+    error_before = np.mean(cv2.absdiff(rotated, template))
+    error_after = np.mean(cv2.absdiff(aligned, template))
+    assert error_after < error_before / 2
+
+def test_scan_color_image_converts_once(sample_scanner, sample_checkbox_image,
+                                        sample_checkbox_field, monkeypatch):
+    """Prueba que una imagen a color se convierte a grises antes de los campos."""
+    shapes = []
+    original = sample_scanner._process_checkbox
+    def spy(roi, options):
+        shapes.append(roi.shape)
+        return original(roi, options)
+    monkeypatch.setattr(sample_scanner, "_process_checkbox", spy)
+    
+    sample_scanner.register_field(sample_checkbox_field)
+    color = cv2.cvtColor(sample_checkbox_image, cv2.COLOR_GRAY2BGR)
+    results = sample_scanner.scan_survey(color)
+    
+    assert isinstance(results["checkbox_field"], str)
+    assert all(len(shape) == 2 for shape in shapes)
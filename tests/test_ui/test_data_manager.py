@@ -1,6 +1,8 @@
 # tests/test_ui/test_data_manager.py
 
 from typing import Dict
+import ast
+import inspect
 import pytest
 import mongomock
 from datetime import datetime
@@ -31,11 +33,16 @@ def mock_db_manager(mock_db):
         def __init__(self):
             self.db = mock_db
             
-        def find_many(self, collection, query):
-            return list(self.db[collection].find(query))
+        def find_many(self, collection, query, projection=None, sort=None, limit=None):
+            cursor = self.db[collection].find(query, projection)
+            if sort:
+                cursor = cursor.sort(sort)
+            if limit:
+                cursor = cursor.limit(limit)
+            return list(cursor)
             
-        def find_one(self, collection, query):
-            return self.db[collection].find_one(query)
+        def find_one(self, collection, query, projection=None):
+            return self.db[collection].find_one(query, projection)
             
         def insert_one(self, collection, document):
             result = self.db[collection].insert_one(document)
@@ -45,9 +52,19 @@ def mock_db_manager(mock_db):
             result = self.db[collection].update_one(query, update)
             return result.modified_count > 0
             
+        def update_many(self, collection, query, update):
+            result = self.db[collection].update_many(query, update)
+            return result.modified_count
+            
         def delete_one(self, collection, query):
             result = self.db[collection].delete_one(query)
             return result.deleted_count > 0
+            
+        def count_documents(self, collection, query):
+            return self.db[collection].count_documents(query)
+            
+        def aggregate(self, collection, pipeline):
+            return list(self.db[collection].aggregate(pipeline))
 
     return MockDatabaseManager()
 
@@ -149,6 +166,70 @@ async def test_delete_activity(ui_data_manager, sample_activity_dict):
     activity = await ui_data_manager.get_activity(activity_id)
     assert activity is None
 
+@pytest.mark.asyncio
+async def test_get_activity_cache(ui_data_manager, sample_activity_dict):
+    """Las lecturas repetidas se sirven desde caché hasta que se modifica la actividad"""
+    activity_id = await ui_data_manager.insert_activity(sample_activity_dict)
+    
+    with patch.object(ui_data_manager.db_manager, "find_one",
+                      wraps=ui_data_manager.db_manager.find_one) as find_one:
+        first = await ui_data_manager.get_activity(activity_id)
+        first["name"] = "Modificada localmente"
+        second = await ui_data_manager.get_activity(activity_id)
+        assert second["name"] == sample_activity_dict["name"]
+        assert find_one.call_count == 1
+        
+        await ui_data_manager.update_activity(activity_id, {"name": "Nuevo nombre"})
+        updated = await ui_data_manager.get_activity(activity_id)
+        assert updated["name"] == "Nuevo nombre"
+        assert find_one.call_count == 2
+
+@pytest.mark.asyncio
+async def test_get_activity_cache_isolation(ui_data_manager, sample_activity_dict):
+    """Los objetos anidados no se comparten con la caché y una lectura cruzada con una escritura no se cachea"""
+    activity_id = await ui_data_manager.insert_activity(sample_activity_dict)
+    
+    first = await ui_data_manager.get_activity(activity_id)
+    first["participant_ids"].append("p1")
+    second = await ui_data_manager.get_activity(activity_id)
+    assert second["participant_ids"] == []
+    
+    # Una escritura termina mientras la lectura está en curso
+    ui_data_manager._invalidate_activity(activity_id)
+    original_find_one = ui_data_manager.db_manager.find_one
+    def find_one_during_update(*args, **kwargs):
+        document = original_find_one(*args, **kwargs)
+        ui_data_manager._invalidate_activity(activity_id)
+        return document
+    with patch.object(ui_data_manager.db_manager, "find_one", side_effect=find_one_during_update):
+        await ui_data_manager.get_activity(activity_id)
+    assert activity_id not in ui_data_manager._activity_cache
+
+@pytest.mark.asyncio
+async def test_modify_array(ui_data_manager, sample_activity_dict):
+    """Test de altas y bajas atómicas en un campo lista"""
+    activity_id = await ui_data_manager.insert_activity(
+        {**sample_activity_dict, "participant_ids": ["p1"]}
+    )
+    await ui_data_manager.get_activity(activity_id)
+    
+    assert await ui_data_manager.modify_array(
+        "activities", activity_id, "$addToSet", "participant_ids", ["p1", "p2", "p3"]
+    )
+    activity = await ui_data_manager.get_activity(activity_id)
+    assert activity["participant_ids"] == ["p1", "p2", "p3"]
+    
+    assert await ui_data_manager.modify_array(
+        "activities", activity_id, "$pull", "participant_ids", ["p1", "p3"]
+    )
+    activity = await ui_data_manager.get_activity(activity_id)
+    assert activity["participant_ids"] == ["p2"]
+    
+    with pytest.raises(ValueError):
+        await ui_data_manager.modify_array(
+            "activities", activity_id, "$push", "participant_ids", ["p4"]
+        )
+
 @patch('src.core.participant.ParticipantIDGenerator')
 def test_add_participant(mock_id_generator, ui_data_manager, sample_participant_data):
     # Configurar el mock del generador de ID
@@ -422,6 +503,15 @@ async def test_update_survey_result(ui_data_manager, sample_activity_dict,
     updated_result = await ui_data_manager.get_survey_result(result_id)
     assert updated_result["confidence"] == 98.0
     assert updated_result["notes"] == "Updated notes"
+    
+    # Solo se envían los campos modificados; sin cambios no se escribe
+    with patch.object(ui_data_manager.db_manager, "update_one",
+                      wraps=ui_data_manager.db_manager.update_one) as update_one:
+        assert await ui_data_manager.update_survey_result(result_id, {"confidence": 99.0})
+        assert update_one.call_args.args[2] == {"$set": {"confidence": 99.0}}
+        
+        assert await ui_data_manager.update_survey_result(result_id, {"confidence": 99.0})
+        assert update_one.call_count == 1
 
 
 @pytest.mark.asyncio
@@ -455,6 +545,19 @@ async def test_get_survey_results_invalid_activity(ui_data_manager):
     results = await ui_data_manager.get_survey_results("invalid_id")
     assert len(results) == 0
 
+def test_ui_data_manager_has_no_duplicate_methods():
+    """Test que UIDataManager no redefine métodos (la última definición oculta a la anterior)"""
+    tree = ast.parse(inspect.getsource(inspect.getmodule(UIDataManager)))
+    class_node = next(
+        node for node in tree.body
+        if isinstance(node, ast.ClassDef) and node.name == "UIDataManager"
+    )
+    names = [
+        node.name for node in class_node.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    ]
+    assert len(names) == len(set(names))
+
 @pytest.mark.asyncio
 async def test_save_survey_result_validation(ui_data_manager, sample_activity_dict, 
                                            sample_participant_data, sample_survey_result):
@@ -513,6 +616,26 @@ async def test_get_survey_results_aggregation(ui_data_manager, sample_activity_d
     assert stats["total_results"] == 3
     assert 90.0 <= stats["avg_confidence"] <= 92.0
 
+@pytest.mark.asyncio
+async def test_survey_results_statistics_legacy_documents(ui_data_manager, mock_db):
+    """La completitud se calcula desde las respuestas, sin depender de campos guardados"""
+    activity_id = str(ObjectId())
+    mock_db["survey_results"].insert_many([
+        {"activity_id": activity_id, "confidence": 80.0,
+         "responses": {"pregunta1": "sí", "pregunta2": "no"}},
+        {"activity_id": activity_id, "confidence": 90.0,
+         "responses": {"pregunta1": "sí", "pregunta2": "  "}},
+        {"activity_id": activity_id, "confidence": 100.0,
+         "responses": {"pregunta1": "no", "pregunta2": "sí"}},
+        {"activity_id": activity_id, "confidence": 70.0, "responses": {"pregunta1": ""}}
+    ])
+    
+    stats = await ui_data_manager.get_survey_results_statistics(activity_id)
+    
+    assert stats["total_results"] == 4
+    assert stats["avg_confidence"] == 85.0
+    assert stats["completion_rate"] == 50.0
+
 @pytest.mark.asyncio
 async def test_save_survey_result_nonexistent_activity(ui_data_manager, sample_survey_result):
     """Test saving survey result for non-existent activity"""
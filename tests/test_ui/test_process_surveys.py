@@ -70,7 +70,7 @@ async def test_save_results(process_dialog):
     
     results_spy = []
     process_dialog.surveys_processed.connect(lambda x: results_spy.extend(x))
-    await process_dialog.save_results()
+    process_dialog.save_results()
     assert len(results_spy) == len(process_dialog.ocr_results)
 
 @pytest.mark.asyncio
@@ -146,7 +146,7 @@ async def test_process_results(process_dialog, sample_images, mock_batch_process
     assert process_dialog.save_btn.isEnabled()
     
     # Guardar resultados
-    await process_dialog.save_results()
+    process_dialog.save_results()
     assert len(results_spy) == 1
     assert results_spy[0]["participant_id"] == "test_id"
 